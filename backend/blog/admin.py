@@ -1,20 +1,33 @@
 from django.contrib import admin
 
-from .models import Post, Comment, Like
+from .models import Post, Comment, Like, PostScore
+from .moderation import moderate_posts
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('user', 'get_username', 'title', 'is_approved', 'created_at')
-    list_filter = ('is_approved', 'created_at')
+    list_display = ('user', 'get_username', 'title', 'is_approved', 'like_count', 'comment_count', 'created_at')
+    list_filter = ('is_approved', 'moderated_at', 'created_at')
     search_fields = ('user__username', 'content', 'title')
+    readonly_fields = ('like_count', 'comment_count', 'moderated_at')
     ordering = ('-created_at',)
+    actions = ('approve_posts', 'reject_posts')
 
     def get_username(self, obj):
         return obj.user.username
 
     get_username.short_description = 'Username'
 
+    @admin.action(description='Одобрить выбранные посты')
+    def approve_posts(self, request, queryset):
+        updated = moderate_posts(queryset, approve=True)
+        self.message_user(request, f"Одобрено постов: {updated}")
+
+    @admin.action(description='Отклонить выбранные посты')
+    def reject_posts(self, request, queryset):
+        updated = moderate_posts(queryset, approve=False)
+        self.message_user(request, f"Отклонено постов: {updated}")
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -40,3 +53,9 @@ class LikeAdmin(admin.ModelAdmin):
         return obj.user.username
 
     get_username.short_description = 'Username'
+
+
+@admin.register(PostScore)
+class PostScoreAdmin(admin.ModelAdmin):
+    list_display = ('post', 'score', 'like_count', 'comment_count', 'last_activity_at', 'refreshed_at')
+    ordering = ('-score',)
@@ -0,0 +1,107 @@
+import threading
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Like
+
+VERSION_KEY = 'blog-feed:version'
+USER_FIELDS = ('is_liked',)
+
+
+class FeedCache:
+    def __init__(self, alias: str = 'default', timeout: int = 300):
+        self.alias = alias
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def version(self) -> int:
+        self.cache.add(VERSION_KEY, 1, None)
+        return self.cache.get(VERSION_KEY) or 1
+
+    def bump(self) -> None:
+        try:
+            self.cache.incr(VERSION_KEY)
+        except ValueError:
+            self.cache.add(VERSION_KEY, 2, None)
+
+    def get_or_build(self, page_key: str, user, build: Callable[[], dict]) -> dict:
+        key = f"blog-feed:{self.version()}:{page_key}"
+        page = self.cache.get(key)
+
+        if page is not None:
+            self._count(hit=True)
+            return overlay_user_fields(page, user)
+
+        self._count(hit=False)
+        data = build()
+        self.cache.set(key, strip_user_fields(data), self.timeout)
+        return data
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "version": self.version(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+def strip_user_fields(data: dict) -> dict:
+    return {
+        **data,
+        "results": [
+            {field: value for field, value in post.items() if field not in USER_FIELDS}
+            for post in data["results"]
+        ],
+    }
+
+
+def overlay_user_fields(page: dict, user) -> dict:
+    ids = [post["id"] for post in page["results"]]
+    liked = set(Like.objects.filter(user=user, post_id__in=ids).values_list('post_id', flat=True))
+    return {
+        **page,
+        "results": [{**post, "is_liked": post["id"] in liked} for post in page["results"]],
+    }
+
+
+_feed_cache = None
+_feed_cache_lock = threading.Lock()
+
+
+def get_feed_cache() -> Optional[FeedCache]:
+    config = settings.BLOG_FEED
+    if not config['CACHE_ENABLED']:
+        return None
+
+    global _feed_cache
+    if _feed_cache is None:
+        with _feed_cache_lock:
+            if _feed_cache is None:
+                _feed_cache = FeedCache(config['CACHE_ALIAS'], config['CACHE_TIMEOUT'])
+    return _feed_cache
+
+
+def invalidate_feed() -> None:
+    feed_cache = get_feed_cache()
+    if feed_cache is None:
+        return
+    feed_cache.bump()
+    transaction.on_commit(feed_cache.bump)
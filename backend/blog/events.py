@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import psycopg2
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, broker, post_ids: Iterable[int], max_queue: int):
+        self.broker = broker
+        self.post_ids = frozenset(post_ids)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def put(self, event: dict) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            self.close()
+
+    def _put(self, event: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, post_ids: Iterable[int]) -> Subscription:
+        subscription = Subscription(self, post_ids, self.max_queue)
+        with self._lock:
+            for post_id in subscription.post_ids:
+                self._subscribers[post_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for post_id in subscription.post_ids:
+                self._subscribers[post_id].discard(subscription)
+                if not self._subscribers[post_id]:
+                    del self._subscribers[post_id]
+
+    def publish(self, event: dict) -> None:
+        self.dispatch(event)
+
+    def dispatch(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(event['post_id'], ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+
+class PostgresBroker(InProcessBroker):
+    CHANNEL = 'blog_events'
+    MAX_PAYLOAD = 7500
+
+    def __init__(self, max_queue: int = 100, database: str = 'default', poll_interval: float = 5.0):
+        super().__init__(max_queue)
+        self.database = database
+        self.poll_interval = poll_interval
+        self._listener = None
+
+    def subscribe(self, post_ids: Iterable[int]) -> Subscription:
+        self._ensure_listener()
+        return super().subscribe(post_ids)
+
+    def publish(self, event: dict) -> None:
+        payload = json.dumps(event, ensure_ascii=False, cls=DjangoJSONEncoder)
+        if len(payload.encode()) > self.MAX_PAYLOAD:
+            event = {key: value for key, value in event.items() if key != 'comment'}
+            payload = json.dumps({**event, "truncated": True}, ensure_ascii=False, cls=DjangoJSONEncoder)
+        with connections[self.database].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.CHANNEL, payload])
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='blog-events', daemon=True)
+                self._listener.start()
+
+    def _listen(self) -> None:
+        params = connections[self.database].get_connection_params()
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(**params)
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.CHANNEL}")
+                while True:
+                    if select.select([connection], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.dispatch(json.loads(connection.notifies.pop(0).payload))
+            except Exception:
+                logger.exception("Соединение для событий блога потеряно, переподключение")
+                time.sleep(self.poll_interval)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> InProcessBroker:
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = settings.BLOG_EVENTS
+                _broker = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def publish_event(event_type: str, post_id: int, **data) -> None:
+    event = {"type": event_type, "post_id": post_id, **data}
+    transaction.on_commit(lambda: get_broker().publish(event))
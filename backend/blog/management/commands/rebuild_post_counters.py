@@ -0,0 +1,21 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, Comment, Like
+
+
+def count_subquery(model):
+    counts = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(count=Count('pk'))
+    return Coalesce(Subquery(counts.values('count')), 0)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики лайков и комментариев у постов по фактическим данным'
+
+    def handle(self, *args, **options):
+        updated = Post.objects.update(
+            like_count=count_subquery(Like),
+            comment_count=count_subquery(Comment),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Пересчитано постов: {updated}"))
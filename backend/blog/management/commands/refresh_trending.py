@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.trending import refresh_trending
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг популярных постов для постов с недавней активностью'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Пересчитать все посты с активностью в окне')
+        parser.add_argument('--interval', type=int, help='Повторять пересчёт каждые N секунд')
+
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            result = refresh_trending(full=full)
+            self.stdout.write(self.style.SUCCESS(
+                f"Обновлено рейтингов: {result['updated']}, удалено: {result['removed']}"
+            ))
+            full = False
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.search import update_search_vector
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает поисковые векторы постов (например, после импорта данных)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help='Обновить только посты без вектора')
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['missing']:
+            queryset = queryset.filter(search_vector__isnull=True)
+        updated = update_search_vector(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Обновлено постов: {updated}"))
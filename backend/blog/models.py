@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.timezone import now
 from users.models import CustomUser
@@ -8,12 +10,30 @@ class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     image = models.ImageField(upload_to='blog_images/', null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_approved = models.BooleanField(default=False)
+    moderated_at = models.DateTimeField(null=True, blank=True)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(default=now)
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_approved=True),
+                name='blog_post_approved_feed_idx',
+            ),
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_approved=False, moderated_at__isnull=True),
+                name='blog_post_moderation_idx',
+            ),
+            GinIndex(fields=['search_vector']),
+        ]
 
 
 class Comment(models.Model):
@@ -25,6 +45,9 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['post', '-created_at', '-id']),
+        ]
 
 
 class Like(models.Model):
@@ -35,3 +58,23 @@ class Like(models.Model):
     class Meta:
         verbose_name = 'Лайк'
         verbose_name_plural = 'Лайки'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'user'], name='unique_like_per_user'),
+        ]
+
+
+class PostScore(models.Model):
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='trending')
+    score = models.FloatField()
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField()
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Рейтинг поста'
+        verbose_name_plural = 'Рейтинги постов'
+        indexes = [
+            models.Index(fields=['-score', '-post']),
+            models.Index(fields=['refreshed_at']),
+        ]
@@ -0,0 +1,17 @@
+from django.db.models import Q
+from django.utils.timezone import now
+
+from .cache import invalidate_feed
+
+
+def moderate_posts(queryset, approve: bool) -> int:
+    updated = queryset.update(is_approved=approve, moderated_at=now())
+    if updated:
+        invalidate_feed()
+    return updated
+
+
+def visible_posts(queryset, user):
+    if user.is_staff:
+        return queryset
+    return queryset.filter(Q(is_approved=True) | Q(user=user))
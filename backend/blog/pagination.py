@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class FeedCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+
+class RankedPagination(LimitOffsetPagination):
+    default_limit = 20
+    max_limit = 50
+
+
+class TrendingCursorPagination(CursorPagination):
+    ordering = ('-trending_score', '-trending_post')
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 50
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
@@ -0,0 +1,30 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db.models import F
+
+SEARCH_CONFIG = 'russian'
+
+
+def post_search_vector():
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('content', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vector(queryset) -> int:
+    return queryset.update(search_vector=post_search_vector())
+
+
+def search_posts(queryset, text: str):
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query),
+        headline=SearchHeadline(
+            'content',
+            query,
+            config=SEARCH_CONFIG,
+            start_sel='<mark>',
+            stop_sel='</mark>',
+            max_fragments=2,
+        ),
+    ).order_by('-rank', '-created_at', '-id')
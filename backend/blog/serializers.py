@@ -1,4 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
+from uploads.images import thumbnail_url
+from uploads.serializers import ImageVariantsField
 
 from .models import Post, Comment, Like
 
@@ -16,7 +19,8 @@ class LikeSerializer(serializers.ModelSerializer):
         return {
             'id': obj.user.id,
             'username': obj.user.username,
-            'avatar': obj.user.avatar.url if obj.user.avatar else None
+            'avatar': obj.user.avatar.url if obj.user.avatar else None,
+            'avatar_thumbnail': thumbnail_url(obj.user.avatar_variants)
         }
 
 
@@ -33,7 +37,8 @@ class CommentSerializer(serializers.ModelSerializer):
         return {
             'id': obj.user.id,
             'username': obj.user.username,
-            'avatar': obj.user.avatar.url if obj.user.avatar else None
+            'avatar': obj.user.avatar.url if obj.user.avatar else None,
+            'avatar_thumbnail': thumbnail_url(obj.user.avatar_variants)
         }
 
     def validate_content(self, value):
@@ -44,28 +49,64 @@ class CommentSerializer(serializers.ModelSerializer):
 
 class PostSerializer(serializers.ModelSerializer):
     user = serializers.SerializerMethodField()
-    comments = CommentSerializer(many=True, read_only=True)
-    likes_count = serializers.SerializerMethodField()
+    comments = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
+    likes_count = serializers.IntegerField(source='like_count', read_only=True)
+    comments_count = serializers.IntegerField(source='comment_count', read_only=True)
     is_liked = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S", read_only=True)
 
     class Meta:
         model = Post
-        fields = ['id', 'user', 'title', 'content', 'image', 'created_at', 'comments', 'likes_count', 'is_liked']
-        read_only_fields = ['user', 'created_at', 'comments', 'likes_count', 'is_liked']
+        fields = ['id', 'user', 'title', 'content', 'image', 'image_variants', 'created_at', 'comments',
+                  'likes_count', 'comments_count', 'is_liked']
+        read_only_fields = ['user', 'created_at', 'comments', 'likes_count', 'comments_count', 'is_liked']
 
     def get_user(self, obj):
         return {
             'id': obj.user.id,
             'username': obj.user.username,
-            'avatar': obj.user.avatar.url if obj.user.avatar else None
+            'avatar': obj.user.avatar.url if obj.user.avatar else None,
+            'avatar_thumbnail': thumbnail_url(obj.user.avatar_variants)
         }
 
-    def get_likes_count(self, obj):
-        return obj.likes.count()
+    def get_comments(self, obj):
+        comments = getattr(obj, 'latest_comments', None)
+        if comments is None:
+            comments = obj.comments.select_related('user').order_by('-created_at', '-id')[
+                :settings.BLOG_FEED['COMMENT_PREVIEW_SIZE']
+            ]
+        return CommentSerializer(comments, many=True, context=self.context).data
 
     def get_is_liked(self, obj):
+        if hasattr(obj, 'is_liked'):
+            return obj.is_liked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
         return False
+
+
+class PostSearchSerializer(PostSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ['rank', 'headline']
+
+
+class PostIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BLOG_FEED['LIKE_STATUS_MAX_IDS'],
+    )
+
+
+class ModerationSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BLOG_FEED['MODERATION_MAX_IDS'],
+    )
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
@@ -0,0 +1,59 @@
+from django.db.models import F, QuerySet
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from uploads.images import image_processed
+from users.models import CustomUser
+
+from .cache import invalidate_feed
+from .models import Post, Comment, Like
+from .search import update_search_vector
+
+COUNTERS = {
+    Like: 'like_count',
+    Comment: 'comment_count',
+}
+
+
+def deleted_with_post(origin) -> bool:
+    return isinstance(origin, Post) or (isinstance(origin, QuerySet) and origin.model is Post)
+
+
+def change_counter(sender, post_id, delta):
+    field = COUNTERS[sender]
+    Post.objects.filter(id=post_id).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Comment)
+def increment_counter(sender, instance, created, **kwargs):
+    if created:
+        change_counter(sender, instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Comment)
+def decrement_counter(sender, instance, origin=None, **kwargs):
+    if not deleted_with_post(origin):
+        change_counter(sender, instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def refresh_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'title', 'content'} & set(update_fields):
+        return
+    update_search_vector(Post.objects.filter(id=instance.id))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+@receiver(image_processed, sender=Post)
+@receiver(image_processed, sender=CustomUser)
+def invalidate_feed_cache(sender, origin=None, **kwargs):
+    if sender is Post or not deleted_with_post(origin):
+        invalidate_feed()
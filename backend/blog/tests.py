@@ -1,3 +1,520 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import CustomUser
+
+from .events import InProcessBroker, get_broker
+from .models import Post, Comment, Like, PostScore
+from .trending import refresh_trending
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PostFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('post-list')
+
+        for i in range(20):
+            post = Post.objects.create(user=self.other, title=f'Пост {i}', content='Текст', is_approved=True)
+            Comment.objects.create(post=post, user=self.other, content='Комментарий')
+            Comment.objects.create(post=post, user=self.user, content='Ответ')
+            Like.objects.create(post=post, user=self.other)
+            if i % 2:
+                Like.objects.create(post=post, user=self.user)
+
+    def test_feed_counts(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for post in response.data['results']:
+            liked = int(post['title'].split()[-1]) % 2 == 1
+            self.assertEqual(post['likes_count'], 2 if liked else 1)
+            self.assertEqual(post['comments_count'], 2)
+            self.assertEqual(post['is_liked'], liked)
+
+    def test_feed_query_count_is_constant(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.list_url, {'limit': 5})
+        with self.assertNumQueries(2):
+            self.client.get(self.list_url, {'limit': 20})
+
+    def test_feed_comment_previews(self):
+        post = Post.objects.order_by('-created_at', '-id').first()
+        for i in range(5):
+            Comment.objects.create(post=post, user=self.other, content=f'Новый {i}')
+
+        response = self.client.get(self.list_url)
+        data = next(item for item in response.data['results'] if item['id'] == post.id)
+        self.assertEqual(data['comments_count'], 7)
+        self.assertEqual([comment['content'] for comment in data['comments']], ['Новый 4', 'Новый 3', 'Новый 2'])
+
+        response = self.client.get(reverse('post-comments-list', kwargs={'post_pk': post.id}))
+        self.assertEqual(len(response.data['results']), 7)
+
+    def test_feed_cursor_pagination(self):
+        Post.objects.update(created_at=Post.objects.first().created_at)
+
+        seen = []
+        response = self.client.get(self.list_url, {'limit': 6})
+        self.assertNotIn('count', response.data)
+        while True:
+            seen += [post['id'] for post in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(seen, sorted(Post.objects.values_list('id', flat=True), reverse=True))
+
+
+class LikeStatusTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('post-like-status')
+        self.posts = [Post.objects.create(user=self.user, title=f'Пост {i}', content='Текст') for i in range(3)]
+        Like.objects.create(post=self.posts[1], user=self.user)
+        Comment.objects.create(post=self.posts[2], user=self.user, content='Комментарий')
+
+    def test_like_status_in_one_query(self):
+        ids = [self.posts[2].id, self.posts[1].id, self.posts[0].id, self.posts[0].id + 100]
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, {'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'id': self.posts[2].id, 'likes_count': 0, 'comments_count': 1, 'is_liked': False},
+            {'id': self.posts[1].id, 'likes_count': 1, 'comments_count': 0, 'is_liked': True},
+            {'id': self.posts[0].id, 'likes_count': 0, 'comments_count': 0, 'is_liked': False},
+        ])
+
+    def test_like_status_query_string(self):
+        response = self.client.get(self.url, {'ids': f'{self.posts[1].id},{self.posts[0].id}'})
+        self.assertEqual([item['is_liked'] for item in response.data['results']], [True, False])
+
+    def test_like_status_validation(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {'ids': list(range(1, 502))}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FeedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.list_url = reverse('post-list')
+        self.post = Post.objects.create(user=self.other, title='Пост', content='Текст', is_approved=True)
+        Like.objects.create(post=self.post, user=self.other)
+
+    def test_cached_page_overlays_is_liked(self):
+        self.client.force_authenticate(user=self.other)
+        self.client.get(self.list_url)
+
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['likes_count'], 1)
+        self.assertFalse(response.data['results'][0]['is_liked'])
+
+        self.client.force_authenticate(user=self.other)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url)
+        self.assertTrue(response.data['results'][0]['is_liked'])
+
+    def test_writes_invalidate_feed(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.list_url)
+
+        self.client.post(reverse('post-likes-list', kwargs={'post_pk': self.post.id}))
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['likes_count'], 2)
+        self.assertTrue(response.data['results'][0]['is_liked'])
+
+        Comment.objects.create(post=self.post, user=self.user, content='Комментарий')
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['comments_count'], 1)
+
+    def test_feed_stats(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+
+        response = self.client.get(reverse('post-feed-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(response.data['hits'], 1)
+        self.assertGreater(response.data['hit_ratio'], 0)
+
+
+class PostSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('post-search')
+        self.title_match = Post.objects.create(
+            user=self.user, title='Силовые тренировки', content='Мой план', is_approved=True
+        )
+        self.content_match = Post.objects.create(
+            user=self.user, title='Неделя', content='Сегодня была тяжёлая тренировка ног', is_approved=True
+        )
+        Post.objects.create(user=self.user, title='Рецепт', content='Овсянка с ягодами', is_approved=True)
+
+    def test_search_ranks_and_highlights(self):
+        response = self.client.get(self.url, {'q': 'тренировка'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        ids = [post['id'] for post in response.data['results']]
+        self.assertEqual(ids, [self.title_match.id, self.content_match.id])
+        self.assertIn('<mark>', response.data['results'][1]['headline'])
+
+    def test_search_follows_edits(self):
+        self.title_match.title = 'Растяжка'
+        self.title_match.save()
+
+        response = self.client.get(self.url, {'q': 'растяжки'})
+        self.assertEqual([post['id'] for post in response.data['results']], [self.title_match.id])
+
+    def test_search_requires_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PostCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(user=self.user, title='Пост', content='Текст')
+
+    def test_like_toggle_updates_counter(self):
+        url = reverse('post-likes-list', kwargs={'post_pk': self.post.id})
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['likes_count'], 1)
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['likes_count'], 0)
+        self.assertFalse(Like.objects.filter(post=self.post).exists())
+
+    def test_like_missing_post(self):
+        url = reverse('post-likes-list', kwargs={'post_pk': self.post.id + 100})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Like.objects.exists())
+
+    def test_comment_updates_counter(self):
+        url = reverse('post-comments-list', kwargs={'post_pk': self.post.id})
+        response = self.client.post(url, {'content': 'Комментарий'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+        url = reverse('post-comments-detail', kwargs={'post_pk': self.post.id, 'pk': response.data['id']})
+        self.client.delete(url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_rebuild_counters(self):
+        Like.objects.create(post=self.post, user=self.user)
+        Comment.objects.create(post=self.post, user=self.user, content='Комментарий')
+        Post.objects.update(like_count=10, comment_count=10)
+
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_post_delete_skips_per_row_counter_updates(self):
+        other = CustomUser.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        other_post = Post.objects.create(user=self.user, title='Другой', content='Текст')
+        for post in (self.post, other_post):
+            Like.objects.create(post=post, user=other)
+            Comment.objects.create(post=post, user=other, content='Комментарий')
+
+        with patch('blog.signals.invalidate_feed') as invalidate, CaptureQueriesContext(connection) as queries:
+            self.post.delete()
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE "blog_post"')])
+        self.assertEqual(invalidate.call_count, 1)
+
+        other.delete()
+        other_post.refresh_from_db()
+        self.assertEqual((other_post.like_count, other_post.comment_count), (0, 0))
+
+
+class PostEventsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(user=self.user, title='Пост', content='Текст')
+
+    async def test_broker_delivers_to_post_subscribers(self):
+        broker = InProcessBroker(max_queue=2)
+        subscription = broker.subscribe([1, 2])
+
+        broker.publish({"type": "like", "post_id": 3})
+        for likes_count in range(3):
+            broker.publish({"type": "like", "post_id": 1, "likes_count": likes_count})
+
+        self.assertEqual((await subscription.get(timeout=1))['likes_count'], 1)
+        self.assertEqual((await subscription.get(timeout=1))['likes_count'], 2)
+        self.assertIsNone(await subscription.get(timeout=0.01))
+
+        subscription.close()
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_like_and_comment_publish_after_commit(self):
+        with patch.object(get_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('post-likes-list', kwargs={'post_pk': self.post.id}))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('post-comments-list', kwargs={'post_pk': self.post.id}), {'content': 'Ура'})
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('post-likes-list', kwargs={'post_pk': self.post.id}))
+
+        events = [call.args[0] for call in publish.call_args_list]
+        self.assertEqual([event['type'] for event in events], ['like', 'comment', 'unlike'])
+        self.assertEqual(events[0]['likes_count'], 1)
+        self.assertEqual(events[1]['comment']['content'], 'Ура')
+        self.assertEqual(events[1]['comments_count'], 1)
+        self.assertEqual(events[2]['likes_count'], 0)
+
+    def test_events_stream_requires_auth_and_posts(self):
+        url = reverse('post-events')
+        self.assertEqual(self.client.get(url, {'posts': self.post.id}).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.assertEqual(self.client.get(url, **auth).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'posts': 'abc'}, **auth).status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = CustomUser.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        pending = Post.objects.create(user=other, title='На проверке', content='Текст')
+        self.assertEqual(self.client.get(url, {'posts': pending.id}, **auth).status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(BLOG_EVENTS={**settings.BLOG_EVENTS, 'HEARTBEAT_INTERVAL': 0.05, 'MAX_STREAM_SECONDS': 0.2})
+    async def test_events_stream_ends_after_max_lifetime(self):
+        broker = InProcessBroker()
+        with patch('blog.views.get_broker', return_value=broker):
+            response = await self.async_client.get(
+                reverse('post-events'),
+                {'posts': f'{self.post.id},{self.post.id + 1000}'},
+                headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'},
+            )
+            chunks = [chunk async for chunk in response.streaming_content]
+
+        self.assertIn(f'"posts": [{self.post.id}]', chunks[0].decode())
+        self.assertIn(b': ping', chunks[1])
+        self.assertTrue(chunks[-1].startswith(b'event: reconnect'))
+        self.assertEqual(broker.subscriber_count(), 0)
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            CustomUser.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='testpass123')
+            for i in range(4)
+        ]
+        self.client.force_authenticate(user=self.users[0])
+        self.url = reverse('post-trending')
+        self.old_hit = Post.objects.create(user=self.users[0], title='Старый хит', content='Текст', is_approved=True)
+        self.fresh = Post.objects.create(user=self.users[0], title='Свежий', content='Текст', is_approved=True)
+        self.quiet = Post.objects.create(user=self.users[0], title='Тихий', content='Текст', is_approved=True)
+
+        for user in self.users[:3]:
+            Like.objects.create(post=self.old_hit, user=user)
+        Like.objects.filter(post=self.old_hit).update(created_at=now() - timedelta(hours=48))
+        for user in self.users[:2]:
+            Like.objects.create(post=self.fresh, user=user)
+        Like.objects.filter(post=self.fresh).update(created_at=now() - timedelta(minutes=10))
+
+    def test_trending_orders_by_decayed_engagement(self):
+        self.assertEqual(refresh_trending(), {'updated': 2, 'removed': 0})
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['id'] for post in response.data['results']], [self.fresh.id, self.old_hit.id])
+
+    def test_trending_pages_by_cursor(self):
+        refresh_trending()
+
+        response = self.client.get(self.url, {'limit': 1})
+        self.assertNotIn('count', response.data)
+        self.assertEqual([post['id'] for post in response.data['results']], [self.fresh.id])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([post['id'] for post in response.data['results']], [self.old_hit.id])
+        self.assertIsNone(response.data['next'])
+
+    def test_refresh_is_incremental(self):
+        refresh_trending()
+        self.assertEqual(refresh_trending(), {'updated': 0, 'removed': 0})
+
+        Comment.objects.create(post=self.quiet, user=self.users[1], content='Комментарий')
+        Comment.objects.create(post=self.quiet, user=self.users[2], content='Комментарий')
+        self.assertEqual(refresh_trending(), {'updated': 1, 'removed': 0})
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['id'], self.quiet.id)
+
+    def test_unlikes_and_stale_posts_drop_out(self):
+        refresh_trending()
+        Like.objects.filter(post=self.fresh).delete()
+        self.assertEqual(refresh_trending(), {'updated': 0, 'removed': 1})
+
+        PostScore.objects.filter(post=self.old_hit).update(last_activity_at=now() - timedelta(days=30))
+        refresh_trending()
+        self.assertFalse(PostScore.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ModerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.admin = CustomUser.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+        self.approved = Post.objects.create(user=self.admin, title='Одобрен', content='Текст', is_approved=True)
+        self.pending = [
+            Post.objects.create(user=self.admin, title=f'На проверке {i}', content='Текст') for i in range(3)
+        ]
+
+    def test_feed_hides_unapproved_posts(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual([post['id'] for post in response.data['results']], [self.approved.id])
+
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.pending[0].id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_pending_posts_reject_likes_and_comments(self):
+        self.client.force_authenticate(user=self.user)
+        pending = self.pending[0]
+
+        response = self.client.post(reverse('post-likes-list', kwargs={'post_pk': pending.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(reverse('post-comments-list', kwargs={'post_pk': pending.id}), {'content': 'Ура'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('post-comments-list', kwargs={'post_pk': pending.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Like.objects.exists() or Comment.objects.exists())
+
+        response = self.client.get(reverse('post-like-status'), {'ids': f'{self.approved.id},{pending.id}'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.approved.id])
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(reverse('post-likes-list', kwargs={'post_pk': pending.id}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_author_sees_own_pending_post(self):
+        self.client.force_authenticate(user=self.user)
+        post = Post.objects.create(user=self.user, title='Мой', content='Текст')
+        response = self.client.get(reverse('post-detail', kwargs={'pk': post.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_moderation(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('post-moderation-queue'))
+        self.assertEqual(len(response.data['results']), 3)
+
+        ids = [post.id for post in self.pending]
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse('post-moderate'), {'ids': ids[:2], 'action': 'approve'}, format='json'
+            )
+        self.assertEqual(response.data['updated'], 2)
+        self.client.post(reverse('post-moderate'), {'ids': ids[2:], 'action': 'reject'}, format='json')
+
+        self.assertEqual(Post.objects.filter(is_approved=True).count(), 3)
+        self.assertFalse(Post.objects.filter(moderated_at__isnull=True).exclude(id=self.approved.id).exists())
+        response = self.client.get(reverse('post-moderation-queue'))
+        self.assertEqual(response.data['results'], [])
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_moderation_requires_staff(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse('post-moderate'), {'ids': [self.pending[0].id], 'action': 'approve'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(reverse('post-moderation-queue')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_action(self):
+        self.client.force_login(self.admin)
+        self.admin.is_superuser = True
+        self.admin.save()
+        response = self.client.post(reverse('admin:blog_post_changelist'), {
+            'action': 'approve_posts',
+            '_selected_action': [post.id for post in self.pending],
+        })
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(Post.objects.filter(is_approved=True).count(), 4)
@@ -0,0 +1,79 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils.timezone import now
+
+from .models import Post, Comment, Like, PostScore
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+REFRESH_OVERLAP = timedelta(minutes=1)
+BATCH_SIZE = 500
+
+
+def log_score(events: list) -> float:
+    half_life = settings.BLOG_TRENDING['HALF_LIFE_HOURS'] * 3600
+    exponents = [((created_at - EPOCH).total_seconds() / half_life, weight) for created_at, weight in events]
+    top = max(exponent for exponent, _ in exponents)
+    return top + math.log2(sum(weight * 2 ** (exponent - top) for exponent, weight in exponents))
+
+
+def dirty_post_ids(since: datetime) -> set:
+    ids = set(Like.objects.filter(created_at__gte=since).values_list('post_id', flat=True))
+    ids.update(Comment.objects.filter(created_at__gte=since).values_list('post_id', flat=True))
+    ids.update(PostScore.objects.filter(
+        ~Q(like_count=F('post__like_count')) | ~Q(comment_count=F('post__comment_count'))
+    ).values_list('post_id', flat=True))
+    return ids
+
+
+def refresh_trending(full: bool = False) -> dict:
+    config = settings.BLOG_TRENDING
+    window_start = now() - timedelta(days=config['WINDOW_DAYS'])
+
+    since = None if full else PostScore.objects.aggregate(last=Max('refreshed_at'))['last']
+    since = max(since - REFRESH_OVERLAP, window_start) if since else window_start
+    ids = sorted(dirty_post_ids(since))
+
+    updated = removed = 0
+    for i in range(0, len(ids), BATCH_SIZE):
+        batch = ids[i:i + BATCH_SIZE]
+        events = defaultdict(list)
+        for post_id, created_at in Like.objects.filter(
+            post_id__in=batch, created_at__gte=window_start
+        ).values_list('post_id', 'created_at'):
+            events[post_id].append((created_at, config['LIKE_WEIGHT']))
+        for post_id, created_at in Comment.objects.filter(
+            post_id__in=batch, created_at__gte=window_start
+        ).values_list('post_id', 'created_at'):
+            events[post_id].append((created_at, config['COMMENT_WEIGHT']))
+
+        scores = [
+            PostScore(
+                post_id=post_id,
+                score=log_score(events[post_id]),
+                like_count=like_count,
+                comment_count=comment_count,
+                last_activity_at=max(created_at for created_at, _ in events[post_id]),
+            )
+            for post_id, like_count, comment_count in Post.objects.filter(
+                id__in=[post_id for post_id in batch if events[post_id]]
+            ).values_list('id', 'like_count', 'comment_count')
+        ]
+
+        inactive = [post_id for post_id in batch if not events[post_id]]
+        with transaction.atomic():
+            PostScore.objects.bulk_create(
+                scores,
+                update_conflicts=True,
+                unique_fields=['post'],
+                update_fields=['score', 'like_count', 'comment_count', 'last_activity_at', 'refreshed_at'],
+            )
+            removed += PostScore.objects.filter(post_id__in=inactive).delete()[0]
+        updated += len(scores)
+
+    removed += PostScore.objects.filter(last_activity_at__lt=window_start).delete()[0]
+    return {"updated": updated, "removed": removed}
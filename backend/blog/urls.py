@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework_nested import routers
-from .views import PostViewSet, CommentViewSet, LikeViewSet
+from .views import PostViewSet, CommentViewSet, LikeViewSet, PostEventsView
 
 router = routers.SimpleRouter()
 router.register(r'posts', PostViewSet, basename='post')
@@ -10,6 +10,7 @@ posts_router.register(r'comments', CommentViewSet, basename='post-comments')
 posts_router.register(r'likes', LikeViewSet, basename='post-likes')
 
 urlpatterns = [
+    path('posts/events/', PostEventsView.as_view(), name='post-events'),
     path('', include(router.urls)),
     path('', include(posts_router.urls)),
 ]
@@ -1,11 +1,31 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Prefetch
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django_filters import rest_framework as filters
 from rest_framework import viewsets, status
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from coaches.streaming import authenticate, sse_event, sse_response
+
+from .cache import get_feed_cache
+from .events import get_broker, publish_event
 from .models import Post, Comment, Like
-from .serializers import PostSerializer, CommentSerializer, LikeSerializer
+from .moderation import moderate_posts, visible_posts
+from .pagination import FeedCursorPagination, RankedPagination, TrendingCursorPagination
+from .search import search_posts
+from .serializers import (
+    PostSerializer, PostSearchSerializer, PostIdsSerializer, ModerationSerializer, CommentSerializer, LikeSerializer
+)
 
 
 class PostFilter(filters.FilterSet):
@@ -20,17 +40,112 @@ class PostViewSet(viewsets.ModelViewSet):
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
     filterset_class = PostFilter
+    pagination_class = FeedCursorPagination
     ordering_fields = ['created_at']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
 
     def get_queryset(self):
-        return Post.objects.select_related('user').prefetch_related('comments', 'likes')
+        latest_comments = Comment.objects.select_related('user').order_by('-created_at', '-id')
+        queryset = Post.objects.select_related('user').prefetch_related(
+            Prefetch(
+                'comments',
+                queryset=latest_comments[:settings.BLOG_FEED['COMMENT_PREVIEW_SIZE']],
+                to_attr='latest_comments'
+            )
+        ).annotate(
+            is_liked=Exists(Like.objects.filter(post=OuterRef('pk'), user=self.request.user)),
+        )
+        if self.action in ('list', 'search', 'trending'):
+            return queryset.filter(is_approved=True)
+        if self.action == 'moderation_queue':
+            return queryset.filter(is_approved=False, moderated_at__isnull=True)
+        return visible_posts(queryset, self.request.user)
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
         return context
 
+    def list(self, request, *args, **kwargs):
+        feed_cache = get_feed_cache()
+        if feed_cache is None:
+            return super().list(request, *args, **kwargs)
+
+        def build():
+            return super(PostViewSet, self).list(request, *args, **kwargs).data
+
+        return Response(feed_cache.get_or_build(request.build_absolute_uri(), request.user, build))
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({"detail": "Укажите поисковый запрос."}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = RankedPagination()
+        page = paginator.paginate_queryset(search_posts(self.get_queryset(), text), request, view=self)
+        serializer = PostSearchSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        queryset = self.get_queryset().filter(trending__isnull=False).annotate(
+            trending_score=F('trending__score'),
+            trending_post=F('trending__post'),
+        )
+        paginator = TrendingCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get', 'post'], url_path='like-status')
+    def like_status(self, request):
+        if request.method == 'GET':
+            data = {"ids": [value for value in request.query_params.get('ids', '').split(',') if value]}
+        else:
+            data = request.data
+        serializer = PostIdsSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        rows = visible_posts(Post.objects.filter(id__in=ids), request.user).annotate(
+            is_liked=Exists(Like.objects.filter(post=OuterRef('pk'), user=request.user)),
+        ).values('id', 'like_count', 'comment_count', 'is_liked')
+        statuses = {row['id']: row for row in rows}
+
+        return Response({"results": [
+            {
+                "id": post_id,
+                "likes_count": statuses[post_id]['like_count'],
+                "comments_count": statuses[post_id]['comment_count'],
+                "is_liked": statuses[post_id]['is_liked'],
+            }
+            for post_id in dict.fromkeys(ids) if post_id in statuses
+        ]})
+
+    @action(detail=False, methods=['get'], url_path='moderation-queue', permission_classes=[IsAdminUser])
+    def moderation_queue(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def moderate(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = moderate_posts(
+            Post.objects.filter(id__in=serializer.validated_data['ids']),
+            approve=serializer.validated_data['action'] == 'approve'
+        )
+        return Response({"updated": updated})
+
+    @action(detail=False, methods=['get'], url_path='feed-stats', permission_classes=[IsAdminUser])
+    def feed_stats(self, request):
+        feed_cache = get_feed_cache()
+        if feed_cache is None:
+            return Response({"enabled": False})
+        return Response({"enabled": True, **feed_cache.stats()})
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -41,11 +156,20 @@ class PostViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class VisiblePostMixin:
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        post_id = str(self.kwargs['post_pk'])
+        if not post_id.isdigit() or not visible_posts(Post.objects.filter(id=post_id), request.user).exists():
+            raise NotFound("Пост не найден")
+
+
+class CommentViewSet(VisiblePostMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedCursorPagination
     ordering_fields = ['created_at']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
 
     def get_queryset(self):
         return Comment.objects.filter(post_id=self.kwargs['post_pk']).select_related('user')
@@ -62,23 +186,30 @@ class CommentViewSet(viewsets.ModelViewSet):
         if not content:
             return Response({"detail": "Комментарий не может быть пустым."}, status=status.HTTP_400_BAD_REQUEST)
 
-        comment = Comment.objects.create(
-            content=content,
-            user=request.user,
-            post_id=post_id
-        )
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                content=content,
+                user=request.user,
+                post_id=post_id
+            )
+            serializer = self.get_serializer(comment)
+            publish_event(
+                "comment", comment.post_id,
+                comment=serializer.data,
+                comments_count=Post.objects.filter(id=comment.post_id).values_list('comment_count', flat=True).first(),
+            )
 
-        serializer = self.get_serializer(comment)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def destroy(self, request, *args, **kwargs):
         comment = self.get_object()
         if comment.user != request.user:
             raise PermissionDenied("Вы не можете удалить чужой комментарий")
-        return super().destroy(request, *args, **kwargs)
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
 
 
-class LikeViewSet(viewsets.ModelViewSet):
+class LikeViewSet(VisiblePostMixin, viewsets.ModelViewSet):
     serializer_class = LikeSerializer
     permission_classes = [IsAuthenticated]
 
@@ -87,24 +218,80 @@ class LikeViewSet(viewsets.ModelViewSet):
 
     def create(self, request, *args, **kwargs):
         post_id = self.kwargs.get('post_pk')
-        post = Post.objects.get(id=post_id)
 
-        like, created = Like.objects.get_or_create(
-            post=post,
-            user=request.user,
-            defaults={'user': request.user}
-        )
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(post_id=post_id, user=request.user).delete()
+            if not deleted:
+                try:
+                    with transaction.atomic():
+                        Like.objects.create(post_id=post_id, user=request.user)
+                except IntegrityError:
+                    pass
+
+            likes_count = Post.objects.filter(id=post_id).values_list('like_count', flat=True).first()
+            if likes_count is None:
+                raise NotFound("Пост не найден")
+            publish_event(
+                "unlike" if deleted else "like", int(post_id),
+                user_id=request.user.id,
+                likes_count=likes_count,
+            )
 
-        if not created:
-            like.delete()
+        if deleted:
             return Response({
                 "status": "unliked",
-                "likes_count": post.likes.count(),
+                "likes_count": likes_count,
                 "is_liked": False
             }, status=status.HTTP_200_OK)
 
         return Response({
             "status": "liked",
-            "likes_count": post.likes.count(),
+            "likes_count": likes_count,
             "is_liked": True
         }, status=status.HTTP_201_CREATED)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class PostEventsView(View):
+    async def get(self, request, *args, **kwargs):
+        user = await authenticate(request)
+        if user is None:
+            return JsonResponse(
+                {"error": "Учетные данные не были предоставлены."},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        config = settings.BLOG_EVENTS
+        try:
+            post_ids = {int(value) for value in request.GET.get('posts', '').split(',') if value}
+        except ValueError:
+            post_ids = set()
+
+        if not post_ids or len(post_ids) > config['MAX_POSTS']:
+            return JsonResponse(
+                {"error": f"Параметр 'posts' должен содержать от 1 до {config['MAX_POSTS']} id постов."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        post_ids = set(await sync_to_async(list)(
+            visible_posts(Post.objects.filter(id__in=post_ids), user).values_list('id', flat=True)
+        ))
+        if not post_ids:
+            return JsonResponse({"error": "Посты не найдены."}, status=status.HTTP_404_NOT_FOUND)
+
+        async def events():
+            subscription = get_broker().subscribe(post_ids)
+            deadline = time.monotonic() + config['MAX_STREAM_SECONDS']
+            try:
+                yield sse_event({"posts": sorted(post_ids)}, event="subscribed")
+                while (remaining := deadline - time.monotonic()) > 0:
+                    event = await subscription.get(timeout=min(config['HEARTBEAT_INTERVAL'], remaining))
+                    if event is None:
+                        yield ": ping\n\n"
+                    else:
+                        yield sse_event(event, event=event["type"])
+                yield sse_event({}, event="reconnect")
+            finally:
+                subscription.close()
+
+        return sse_response(events())
@@ -1,3 +1,44 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Conversation, GenerationJob, Message, PlanPoolEntry
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('user', 'get_username', 'task', 'status', 'created_at', 'updated_at')
+    list_filter = ('task', 'status', 'created_at')
+    search_fields = ('user__username',)
+    ordering = ('-created_at',)
+
+    def get_username(self, obj):
+        return obj.user.username
+
+    get_username.short_description = 'Username'
+
+
+@admin.register(PlanPoolEntry)
+class PlanPoolEntryAdmin(admin.ModelAdmin):
+    list_display = ('task', 'goal', 'fitness_level', 'has_equipment', 'gender', 'created_at')
+    list_filter = ('task', 'goal', 'fitness_level', 'has_equipment', 'gender')
+    ordering = ('-created_at',)
+
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'get_username', 'title', 'created_at', 'updated_at')
+    list_filter = ('created_at',)
+    search_fields = ('user__username', 'title')
+    ordering = ('-updated_at',)
+
+    def get_username(self, obj):
+        return obj.user.username
+
+    get_username.short_description = 'Username'
+
+
+@admin.register(Message)
+class MessageAdmin(admin.ModelAdmin):
+    list_display = ('conversation', 'role', 'content', 'is_compacted', 'created_at')
+    list_filter = ('role', 'is_compacted', 'created_at')
+    search_fields = ('content',)
+    ordering = ('-created_at',)
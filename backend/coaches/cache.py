@@ -0,0 +1,138 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LocMemBackend:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[list]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: list, timeout: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoCacheBackend:
+    def __init__(self, alias: str = 'default', key_prefix: str = 'llm'):
+        self.cache = caches[alias]
+        self.key_prefix = key_prefix
+
+    def get(self, key: str) -> Optional[list]:
+        return self.cache.get(f"{self.key_prefix}:{key}")
+
+    def set(self, key: str, value: list, timeout: int) -> None:
+        self.cache.set(f"{self.key_prefix}:{key}", value, timeout)
+
+
+def normalize_messages(messages: list) -> list:
+    return [
+        {
+            "role": str(message.get("role", "")).strip().lower(),
+            "content": " ".join(str(message.get("content", "")).split()),
+        }
+        for message in messages
+    ]
+
+
+def make_key(messages: list, model: str, temperature: float) -> str:
+    raw = json.dumps(
+        {"model": model, "temperature": temperature, "messages": normalize_messages(messages)},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, backend, timeouts: dict, variants: int = 1):
+        self.backend = backend
+        self.timeouts = timeouts
+        self.variants = max(variants, 1)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_generate(self, task: Optional[str], messages: list, model: str, temperature: float,
+                        generate: Callable[[], str], validate: Optional[Callable[[str], object]] = None) -> str:
+        timeout = self.timeouts.get(task)
+        if not timeout:
+            return generate()
+
+        key = make_key(messages, model, temperature)
+        answers = self.backend.get(key) or []
+
+        if len(answers) >= self.variants:
+            self._count(hit=True)
+            return random.choice(answers)
+
+        self._count(hit=False)
+        answer = generate()
+        if validate is not None:
+            validate(answer)
+        self.backend.set(key, (answers + [answer])[-self.variants:], timeout)
+        return answer
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                config = settings.LLM_CACHE
+                if config['BACKEND'] == 'django':
+                    backend = DjangoCacheBackend(config.get('CACHE_ALIAS', 'default'))
+                else:
+                    backend = LocMemBackend(config.get('MAX_ENTRIES', 1024))
+                _response_cache = ResponseCache(
+                    backend,
+                    timeouts=config.get('TIMEOUTS', {}),
+                    variants=config.get('VARIANTS', 1),
+                )
+    return _response_cache
@@ -0,0 +1,146 @@
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+from django.conf import settings
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+TRANSIENT_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._is_open()
+
+    def _is_open(self) -> bool:
+        if self.opened_at is None:
+            return False
+        return self.trial_in_flight or time.monotonic() - self.opened_at < self.reset_timeout
+
+    def check(self) -> None:
+        with self._lock:
+            if self._is_open():
+                raise CircuitOpenError("Сервис генерации временно недоступен, попробуйте позже.")
+            if self.opened_at is not None:
+                self.trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+    def release(self) -> None:
+        with self._lock:
+            self.trial_in_flight = False
+
+
+_async_clients = {}
+_breakers = {}
+_lock = threading.Lock()
+
+
+def get_backends() -> dict:
+    return {backend['NAME']: backend for backend in settings.LLM_BACKENDS}
+
+
+def _http_options() -> dict:
+    config = settings.LLM_CLIENT
+    return {
+        'proxy': settings.OPENAI_PROXY,
+        'limits': httpx.Limits(
+            max_connections=config['MAX_CONNECTIONS'],
+            max_keepalive_connections=config['MAX_KEEPALIVE_CONNECTIONS'],
+            keepalive_expiry=config['KEEPALIVE_EXPIRY'],
+        ),
+        'timeout': httpx.Timeout(config['TIMEOUT'], connect=config['CONNECT_TIMEOUT']),
+    }
+
+
+def make_async_client(backend: str = 'default') -> AsyncOpenAI:
+    config = get_backends()[backend]
+    options = _http_options()
+    return AsyncOpenAI(
+        api_key=config['API_KEY'],
+        base_url=config.get('BASE_URL'),
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(local_address="0.0.0.0", limits=options['limits']),
+            **options
+        )
+    )
+
+
+def get_async_client(backend: str = 'default') -> AsyncOpenAI:
+    if backend not in _async_clients:
+        with _lock:
+            if backend not in _async_clients:
+                _async_clients[backend] = make_async_client(backend)
+    return _async_clients[backend]
+
+
+def get_breaker(backend: str = 'default') -> CircuitBreaker:
+    if backend not in _breakers:
+        with _lock:
+            if backend not in _breakers:
+                _breakers[backend] = CircuitBreaker(
+                    settings.LLM_CLIENT['BREAKER_THRESHOLD'],
+                    settings.LLM_CLIENT['BREAKER_RESET_TIMEOUT'],
+                )
+    return _breakers[backend]
+
+
+def backoff_delay(attempt: int) -> float:
+    config = settings.LLM_CLIENT
+    delay = min(config['BACKOFF_BASE'] * 2 ** attempt, config['BACKOFF_MAX'])
+    return delay * random.uniform(0.5, 1.5)
+
+
+async def acall_with_retries(func, *args, backend: str = 'default', **kwargs):
+    breaker = get_breaker(backend)
+    attempt = 0
+    while True:
+        breaker.check()
+        try:
+            result = await func(*args, **kwargs)
+        except TRANSIENT_ERRORS:
+            breaker.record_failure()
+            if attempt >= settings.LLM_CLIENT['MAX_RETRIES']:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            breaker.record_success()
+            return result
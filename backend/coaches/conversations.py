@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .jobs import run_in_background
+from .models import Conversation, Message
+from .services import generate_answer
+from .utils import get_system_message
+
+SUMMARY_PROMPT = (
+    "Кратко перескажи разговор клиента с фитнес-тренером. Сохрани факты о клиенте, его вопросы, "
+    "договорённости и данные рекомендации. Не добавляй ничего от себя. Пиши не больше 10 предложений."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def build_messages(conversation: Conversation) -> list:
+    messages = [get_system_message(conversation.user)]
+    if conversation.summary:
+        messages.append({
+            "role": "system",
+            "content": f"Краткое содержание предыдущей части разговора:\n{conversation.summary}"
+        })
+    messages += [
+        {"role": message.role, "content": message.content}
+        for message in conversation.messages.filter(is_compacted=False).order_by('created_at', 'id')
+    ]
+    return messages
+
+
+def reply(conversation: Conversation, content: str) -> Message:
+    answer = generate_answer(messages=build_messages(conversation) + [{"role": "user", "content": content}])
+
+    with transaction.atomic():
+        Message.objects.create(conversation=conversation, role=Message.Role.USER, content=content)
+        message = Message.objects.create(conversation=conversation, role=Message.Role.ASSISTANT, content=answer)
+
+        if not conversation.title:
+            conversation.title = content[:255]
+        conversation.save(update_fields=['title', 'updated_at'])
+    return message
+
+
+def needs_compaction(conversation: Conversation) -> bool:
+    contents = conversation.messages.filter(is_compacted=False).values_list('content', flat=True)
+    return sum(estimate_tokens(content) for content in contents) > settings.COACH_CONVERSATION['TOKEN_BUDGET']
+
+
+def compaction_key(conversation_id: int) -> str:
+    return f"conversation-compaction:{conversation_id}"
+
+
+def schedule_compaction(conversation: Conversation) -> bool:
+    if not needs_compaction(conversation):
+        return False
+    cache = caches[settings.COACH_CONVERSATION['CACHE_ALIAS']]
+    if not cache.add(compaction_key(conversation.id), True, settings.COACH_CONVERSATION['COMPACTION_TIMEOUT']):
+        return False
+    run_in_background(compact, conversation.id)
+    return True
+
+
+def compact(conversation_id: int) -> None:
+    try:
+        _compact(conversation_id)
+    finally:
+        caches[settings.COACH_CONVERSATION['CACHE_ALIAS']].delete(compaction_key(conversation_id))
+
+
+def _compact(conversation_id: int) -> None:
+    conversation = Conversation.objects.get(id=conversation_id)
+    messages = list(conversation.messages.filter(is_compacted=False).order_by('created_at', 'id'))
+
+    kept_tokens = 0
+    split = len(messages)
+    while split > 0:
+        tokens = estimate_tokens(messages[split - 1].content)
+        if kept_tokens + tokens > settings.COACH_CONVERSATION['KEEP_TOKENS']:
+            break
+        kept_tokens += tokens
+        split -= 1
+
+    older = messages[:split]
+    if not older:
+        return
+
+    transcript = "\n".join(f"{message.get_role_display()}: {message.content}" for message in older)
+    if conversation.summary:
+        transcript = f"Ранее: {conversation.summary}\n{transcript}"
+
+    summary = generate_answer(
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": transcript},
+        ],
+        temperature=0.3
+    )
+
+    with transaction.atomic():
+        Conversation.objects.filter(id=conversation.id).update(summary=summary)
+        Message.objects.filter(id__in=[message.id for message in older]).update(is_compacted=True)
@@ -0,0 +1,72 @@
+import functools
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+def single_flight(scope: str):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            config = settings.SINGLE_FLIGHT
+            cache = caches[config['CACHE_ALIAS']]
+            idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+
+            if idempotency_key:
+                flight_key = f"idem:{request.user.pk}:{scope}:{idempotency_key}"
+                stored = cache.get(f"{flight_key}:response")
+                if stored:
+                    return _replay(stored)
+            else:
+                flight_key = f"flight:{request.user.pk}:{scope}"
+
+            token = uuid.uuid4().hex
+            if cache.add(flight_key, token, config['LOCK_TIMEOUT']):
+                try:
+                    response = view(self, request, *args, **kwargs)
+                    stored = (response.status_code, response.data)
+                    cache.set(f"flight-result:{token}", stored, config['RESULT_TTL'])
+                    if idempotency_key and response.status_code < 500:
+                        cache.set(f"{flight_key}:response", stored, config['IDEMPOTENCY_TTL'])
+                    return response
+                finally:
+                    if cache.get(flight_key) == token:
+                        cache.delete(flight_key)
+
+            leader = cache.get(flight_key)
+            deadline = time.monotonic() + config['FOLLOWER_WAIT']
+            while leader and time.monotonic() < deadline:
+                running = cache.get(flight_key) == leader
+                stored = cache.get(f"flight-result:{leader}")
+                if stored:
+                    return _replay(stored)
+                if not running:
+                    return wrapper(self, request, *args, **kwargs)
+                time.sleep(config['POLL_INTERVAL'])
+
+            if not leader:
+                return wrapper(self, request, *args, **kwargs)
+
+            response = Response(
+                {"error": "Такой запрос уже выполняется, повторите попытку позже."},
+                status=status.HTTP_409_CONFLICT
+            )
+            response['Retry-After'] = str(config['FOLLOWER_WAIT'])
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _replay(stored) -> Response:
+    status_code, data = stored
+    response = Response(data, status=status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from .models import GenerationJob
+from .pool import generate_plan
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.GENERATION_WORKERS,
+    thread_name_prefix='generation',
+)
+
+
+def submit_job(user, task: str) -> GenerationJob:
+    job = GenerationJob.objects.create(user=user, task=task)
+    run_in_background(run_job, job.id)
+    return job
+
+
+def run_in_background(func, *args) -> None:
+    transaction.on_commit(lambda: _executor.submit(_worker, func, *args))
+
+
+def run_job(job_id: int) -> None:
+    claimed = GenerationJob.objects.filter(
+        id=job_id, status=GenerationJob.Status.PENDING
+    ).update(status=GenerationJob.Status.RUNNING, updated_at=now())
+    if not claimed:
+        return
+
+    job = GenerationJob.objects.select_related('user').get(id=job_id)
+    try:
+        handler = import_string(settings.GENERATION_JOB_HANDLERS[job.task])
+        job.result = handler(job.user, generate_plan(job.user, job.task))
+        job.status = GenerationJob.Status.DONE
+    except Exception as e:
+        job.error = str(e)
+        job.status = GenerationJob.Status.FAILED
+    job.save(update_fields=['result', 'error', 'status', 'updated_at'])
+
+
+def fail_stale_jobs(queryset=None) -> int:
+    cutoff = now() - timedelta(seconds=settings.GENERATION_JOB_TIMEOUT)
+    if queryset is None:
+        queryset = GenerationJob.objects.all()
+    return queryset.filter(
+        status__in=[GenerationJob.Status.PENDING, GenerationJob.Status.RUNNING],
+        updated_at__lt=cutoff,
+    ).update(
+        status=GenerationJob.Status.FAILED,
+        error="Задача прервана: превышено время выполнения.",
+        updated_at=now(),
+    )
+
+
+def _worker(func, *args) -> None:
+    close_old_connections()
+    try:
+        func(*args)
+    finally:
+        connection.close()
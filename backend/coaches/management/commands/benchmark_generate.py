@@ -0,0 +1,123 @@
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+from coaches.idempotency import IDEMPOTENCY_HEADER
+
+ENDPOINTS = {
+    'coach': ('coaches/generate/', {"messages": [{"role": "user", "content": "Как восстановиться после тренировки?"}]}),
+    'coach-stream': ('coaches/generate/stream/', {"messages": [{"role": "user", "content": "Как восстановиться?"}]}),
+    'workout': ('workouts/generate/', None),
+    'workout-async': ('workouts/generate-async/', None),
+    'workout-stream': ('workouts/generate/stream/', None),
+    'nutrition': ('nutrition/generate/', None),
+    'nutrition-async': ('nutrition/generate-async/', None),
+}
+
+SSE_ERROR = re.compile(rb'^event: error$', re.MULTILINE)
+
+
+def percentile(values: list, percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(percent / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест эндпоинтов генерации: пропускная способность, задержки и загрузка воркеров. '
+        'Чтобы измерять саму генерацию, а не кэш и пул готовых планов, запускайте сервер с '
+        'PLAN_POOL_ENABLED=false LLM_CACHE_WORKOUT_TTL=0 LLM_CACHE_NUTRITION_TTL=0'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000/api/')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--endpoint', choices=ENDPOINTS, default='workout')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--workers', type=int, help='Число воркеров сервера для оценки загрузки')
+        parser.add_argument('--timeout', type=float, default=120)
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/') + '/'
+        path, payload = ENDPOINTS[options['endpoint']]
+
+        with httpx.Client(base_url=base_url, timeout=options['timeout']) as client:
+            response = client.post('token/', json={
+                "username": options['username'],
+                "password": options['password'],
+            })
+            if response.status_code != 200:
+                raise CommandError(f"Не удалось получить токен: {response.status_code} {response.text}")
+            headers = {"Authorization": f"Bearer {response.json()['access']}"}
+
+        limits = httpx.Limits(max_connections=options['concurrency'])
+        client = httpx.Client(base_url=base_url, timeout=options['timeout'], headers=headers, limits=limits)
+        latencies = []
+        first_bytes = []
+        errors = {}
+        lock = threading.Lock()
+
+        def run_one(_):
+            started = time.monotonic()
+            first_byte = None
+            body = b''
+            try:
+                with client.stream(
+                    'POST', path, json=payload, headers={IDEMPOTENCY_HEADER: uuid.uuid4().hex}
+                ) as response:
+                    for chunk in response.iter_bytes():
+                        if first_byte is None:
+                            first_byte = time.monotonic() - started
+                        body += chunk
+                    status_code = response.status_code
+                    if response.headers.get('content-type', '').startswith('text/event-stream') \
+                            and SSE_ERROR.search(body):
+                        status_code = 'event: error'
+            except httpx.HTTPError as e:
+                status_code = type(e).__name__
+            elapsed = time.monotonic() - started
+
+            with lock:
+                if isinstance(status_code, int) and status_code < 400:
+                    latencies.append(elapsed)
+                    first_bytes.append(first_byte if first_byte is not None else elapsed)
+                else:
+                    errors[status_code] = errors.get(status_code, 0) + 1
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(run_one, range(options['requests'])))
+        wall = time.monotonic() - started
+        client.close()
+
+        throughput = len(latencies) / wall if wall else 0
+        mean = sum(latencies) / len(latencies) if latencies else 0
+
+        self.stdout.write(f"Эндпоинт:            {path}")
+        self.stdout.write(f"Запросов:            {options['requests']} (параллельно {options['concurrency']})")
+        self.stdout.write(f"Успешно:             {len(latencies)}")
+        self.stdout.write(f"Ошибки:              {errors or 0}")
+        self.stdout.write(f"Время:               {wall:.2f} с")
+        self.stdout.write(f"Пропускная способность: {throughput:.2f} запр/с")
+        self.stdout.write(
+            f"Задержка, с:         p50={percentile(latencies, 50):.3f} p95={percentile(latencies, 95):.3f} "
+            f"p99={percentile(latencies, 99):.3f} max={max(latencies, default=0):.3f}"
+        )
+        self.stdout.write(
+            f"Первый байт, с:      p50={percentile(first_bytes, 50):.3f} p95={percentile(first_bytes, 95):.3f} "
+            f"p99={percentile(first_bytes, 99):.3f}"
+        )
+        in_flight = throughput * mean
+        self.stdout.write(f"Запросов в работе:   {in_flight:.2f} в среднем")
+        if options['workers']:
+            self.stdout.write(f"Загрузка воркеров:   {min(in_flight / options['workers'], 1):.0%}")
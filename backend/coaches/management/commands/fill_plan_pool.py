@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from coaches.models import GenerationJob
+from coaches.pool import iter_segments, refill_segment
+
+
+class Command(BaseCommand):
+    help = 'Заполняет пул готовых планов тренировок и питания для каждого сегмента пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--task', choices=GenerationJob.Task.values, help='Заполнить пул только для одной задачи')
+        parser.add_argument('--size', type=int, help='Сколько свежих планов держать на сегмент')
+        parser.add_argument('--interval', type=int, help='Повторять пополнение каждые N секунд')
+
+    def handle(self, *args, **options):
+        tasks = [options['task']] if options['task'] else GenerationJob.Task.values
+
+        while True:
+            created = 0
+            for task in tasks:
+                for segment in iter_segments():
+                    try:
+                        created += refill_segment(task, segment, options['size'])
+                    except Exception as e:
+                        self.stderr.write(f"{task} {segment}: {e}")
+            self.stdout.write(self.style.SUCCESS(f"Создано планов: {created}"))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
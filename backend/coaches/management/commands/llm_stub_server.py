@@ -0,0 +1,176 @@
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+WORKOUT_PLAN = {
+    "title": "Круговая тренировка на всё тело",
+    "exercises": [
+        {"name": "Приседания", "sets": 4, "reps": 15, "description": "Спина прямая, колени над стопами"},
+        {"name": "Отжимания", "sets": 3, "reps": 12, "description": "Корпус в одну линию"},
+        {"name": "Альпинисты", "sets": 3, "reps": 20, "description": "Быстро подтягивайте колени к груди"},
+        {"name": "Планка с отведением руки", "sets": 3, "reps": 10, "description": "Таз не раскачивается"},
+    ],
+}
+
+NUTRITION_PLAN = {
+    "meals": {
+        "breakfast": {"items": ["Овсянка", "Ягоды", "Греческий йогурт"], "grams": [60, 100, 150],
+                      "calories": 420, "proteins": 22, "fats": 8, "carbs": 62},
+        "lunch": {"items": ["Куриная грудка", "Булгур", "Овощной салат"], "grams": [150, 80, 200],
+                  "calories": 610, "proteins": 48, "fats": 14, "carbs": 70},
+        "dinner": {"items": ["Запечённый лосось", "Брокколи"], "grams": [150, 200],
+                   "calories": 480, "proteins": 38, "fats": 28, "carbs": 14},
+    },
+    "calories": 1510,
+}
+
+CHAT_ANSWER = (
+    "Для восстановления спите 7–9 часов, пейте достаточно воды и добавляйте лёгкую активность "
+    "в дни отдыха. Если чувствуете сильную усталость, снизьте интенсивность тренировок."
+)
+
+
+def canned_answer(messages: list) -> str:
+    prompt = messages[0].get("content", "") if messages else ""
+    if '"days"' in prompt and '"exercises"' in prompt:
+        return json.dumps({"days": [WORKOUT_PLAN] * 7}, ensure_ascii=False)
+    if '"days"' in prompt:
+        return json.dumps({"days": [NUTRITION_PLAN] * 7}, ensure_ascii=False)
+    if '"exercises"' in prompt:
+        return json.dumps(WORKOUT_PLAN, ensure_ascii=False)
+    if '"meals"' in prompt:
+        return json.dumps(NUTRITION_PLAN, ensure_ascii=False)
+    return CHAT_ANSWER
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    options = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self.send_json(404, {"error": {"message": "Not found"}})
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        time.sleep(self.latency())
+        if random.random() < self.options["error_rate"]:
+            return self.send_json(
+                random.choice([429, 500, 503]),
+                {"error": {"message": "Stub upstream error", "type": "server_error"}}
+            )
+
+        answer = canned_answer(body.get("messages", []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get("model", "stub")
+
+        if body.get("stream"):
+            return self.send_stream(completion_id, model, answer)
+
+        self.send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(answer) // 4, "total_tokens": len(answer) // 4},
+        })
+
+    def latency(self) -> float:
+        mean = self.options["latency_mean"]
+        distribution = self.options["latency_distribution"]
+        if distribution == "uniform":
+            return random.uniform(0, 2 * mean)
+        if distribution == "exponential":
+            return random.expovariate(1 / mean) if mean else 0
+        if distribution == "lognormal":
+            sigma = self.options["latency_sigma"]
+            return random.lognormvariate(-sigma ** 2 / 2, sigma) * mean if mean else 0
+        return mean
+
+    def send_json(self, status_code: int, payload: dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, completion_id: str, model: str, answer: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        size = self.options["chunk_size"]
+        delay = 1 / self.options["chunk_rate"] if self.options["chunk_rate"] else 0
+        for i in range(0, len(answer), size):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": answer[i:i + size]}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def make_server(host: str, port: int, **options) -> ThreadingHTTPServer:
+    handler = type("ConfiguredStubLLMHandler", (StubLLMHandler,), {"options": options})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+class Command(BaseCommand):
+    help = 'Запускает OpenAI-совместимый сервер-заглушку для нагрузочного тестирования генерации'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--latency-distribution', default='lognormal',
+                            choices=['fixed', 'uniform', 'exponential', 'lognormal'])
+        parser.add_argument('--latency-mean', type=float, default=2.0, help='Средняя задержка ответа, сек')
+        parser.add_argument('--latency-sigma', type=float, default=0.5, help='Разброс для lognormal')
+        parser.add_argument('--chunk-rate', type=float, default=50, help='Чанков в секунду при stream=true')
+        parser.add_argument('--chunk-size', type=int, default=4, help='Символов в одном чанке')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов с ошибкой 429/5xx')
+
+    def handle(self, *args, **options):
+        server = make_server(
+            options['host'],
+            options['port'],
+            latency_distribution=options['latency_distribution'],
+            latency_mean=options['latency_mean'],
+            latency_sigma=options['latency_sigma'],
+            chunk_rate=options['chunk_rate'],
+            chunk_size=options['chunk_size'],
+            error_rate=options['error_rate'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"LLM-заглушка слушает http://{options['host']}:{server.server_port}/v1 "
+            f"(OPENAI_BASE_URL=http://{options['host']}:{server.server_port}/v1)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -1,3 +1,79 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from users.models import CustomUser
 
-# Create your models here.
+
+class GenerationJob(models.Model):
+    class Task(models.TextChoices):
+        WORKOUT = 'workout', 'Тренировка'
+        NUTRITION = 'nutrition', 'Питание'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    task = models.CharField(max_length=20, choices=Task.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+    class Meta:
+        verbose_name = 'Задача генерации'
+        verbose_name_plural = 'Задачи генерации'
+
+
+class PlanPoolEntry(models.Model):
+    task = models.CharField(max_length=20, choices=GenerationJob.Task.choices)
+    goal = models.CharField(max_length=20, choices=CustomUser.FitnessGoal.choices)
+    fitness_level = models.CharField(max_length=20, choices=CustomUser.FitnessLevel.choices)
+    has_equipment = models.BooleanField()
+    gender = models.CharField(max_length=10)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Готовый план'
+        verbose_name_plural = 'Готовые планы'
+        indexes = [
+            models.Index(fields=['task', 'goal', 'fitness_level', 'has_equipment', 'gender', 'created_at']),
+        ]
+
+
+class Conversation(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='conversations')
+    title = models.CharField(max_length=255, blank=True)
+    summary = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Диалог'
+        verbose_name_plural = 'Диалоги'
+
+
+class Message(models.Model):
+    class Role(models.TextChoices):
+        USER = 'user', 'Пользователь'
+        ASSISTANT = 'assistant', 'Коуч'
+
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
+    role = models.CharField(max_length=20, choices=Role.choices)
+    content = models.TextField()
+    is_compacted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Сообщение'
+        verbose_name_plural = 'Сообщения'
+        indexes = [
+            models.Index(fields=['conversation', 'is_compacted', 'created_at']),
+        ]
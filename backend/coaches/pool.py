@@ -0,0 +1,134 @@
+import itertools
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils.timezone import now
+from users.models import CustomUser
+
+from .models import GenerationJob, PlanPoolEntry
+from .services import generate_answer
+from .utils import get_segment_message, get_system_message
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_KEYS = {
+    GenerationJob.Task.WORKOUT: ('title', 'exercises'),
+    GenerationJob.Task.NUTRITION: ('meals',),
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PLAN_POOL['WORKERS'],
+    thread_name_prefix='plan-pool',
+)
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+
+def iter_segments() -> Iterator[dict]:
+    for goal, fitness_level, has_equipment, gender in itertools.product(
+        CustomUser.FitnessGoal.values,
+        CustomUser.FitnessLevel.values,
+        [True, False],
+        settings.PLAN_POOL['GENDERS'],
+    ):
+        yield {
+            'goal': goal,
+            'fitness_level': fitness_level,
+            'has_equipment': has_equipment,
+            'gender': gender,
+        }
+
+
+def user_segment(user: CustomUser) -> Optional[dict]:
+    if not user.goal or not user.fitness_level or user.gender not in settings.PLAN_POOL['GENDERS']:
+        return None
+    return {
+        'goal': user.goal,
+        'fitness_level': user.fitness_level,
+        'has_equipment': user.has_equipment,
+        'gender': user.gender,
+    }
+
+
+def fresh_entries(task: str, segment: dict):
+    cutoff = now() - settings.PLAN_POOL['MAX_AGE']
+    return PlanPoolEntry.objects.filter(task=task, created_at__gte=cutoff, **segment)
+
+
+def parse_plan(result: str, task: str) -> dict:
+    data = json.loads(result)
+    missing = [key for key in REQUIRED_KEYS[task] if key not in data]
+    if missing:
+        raise ValueError(f"В плане нет полей: {', '.join(missing)}")
+    return data
+
+
+def generate_plan(user: CustomUser, task: str) -> dict:
+    data = take_plan(user, task)
+    if data is None:
+        result = generate_answer(
+            messages=[get_system_message(user, task)],
+            temperature=0.7,
+            task=task,
+            validate=lambda answer: parse_plan(answer, task),
+        )
+        data = parse_plan(result, task)
+    return data
+
+
+def take_plan(user: CustomUser, task: str) -> Optional[dict]:
+    segment = user_segment(user)
+    if not settings.PLAN_POOL['ENABLED'] or segment is None:
+        return None
+
+    entries = fresh_entries(task, segment)
+    with transaction.atomic():
+        entry = entries.order_by('created_at').select_for_update(skip_locked=True).first()
+        if entry:
+            entry.delete()
+
+    if entries.count() < settings.PLAN_POOL['LOW_WATER']:
+        schedule_refill(task, segment)
+
+    return entry.data if entry else None
+
+
+def refill_segment(task: str, segment: dict, size: Optional[int] = None) -> int:
+    size = settings.PLAN_POOL['SIZE'] if size is None else size
+    PlanPoolEntry.objects.filter(
+        task=task, created_at__lt=now() - settings.PLAN_POOL['MAX_AGE'], **segment
+    ).delete()
+
+    created = 0
+    for _ in range(size - fresh_entries(task, segment).count()):
+        result = generate_answer(messages=[get_segment_message(segment, task)], temperature=0.9)
+        data = parse_plan(result, task)
+        PlanPoolEntry.objects.create(task=task, data=data, **segment)
+        created += 1
+    return created
+
+
+def schedule_refill(task: str, segment: dict) -> None:
+    key = (task, *segment.values())
+    with _refilling_lock:
+        if key in _refilling:
+            return
+        _refilling.add(key)
+    transaction.on_commit(lambda: _executor.submit(_refill_worker, task, segment, key))
+
+
+def _refill_worker(task: str, segment: dict, key: tuple) -> None:
+    close_old_connections()
+    try:
+        refill_segment(task, segment)
+    except Exception:
+        logger.exception("Не удалось пополнить пул планов %s", key)
+    finally:
+        with _refilling_lock:
+            _refilling.discard(key)
+        connection.close()
@@ -0,0 +1,34 @@
+from rest_framework import serializers
+
+from .models import Conversation, GenerationJob, Message
+
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GenerationJob
+        fields = ['id', 'task', 'status', 'result', 'error', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class MessageSerializer(serializers.ModelSerializer):
+    created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S", read_only=True)
+
+    class Meta:
+        model = Message
+        fields = ['id', 'role', 'content', 'created_at']
+        read_only_fields = ['role', 'created_at']
+
+    def validate_content(self, value):
+        if not value.strip():
+            raise serializers.ValidationError("Сообщение не может быть пустым")
+        return value
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S", read_only=True)
+    updated_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S", read_only=True)
+
+    class Meta:
+        model = Conversation
+        fields = ['id', 'title', 'created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at']
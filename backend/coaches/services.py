@@ -1,15 +1,190 @@
+import asyncio
+import bisect
+import random
+import threading
+import time
+from typing import AsyncIterator, Callable, Optional
+
 from django.conf import settings
 from openai import OpenAIError
 
+from .cache import get_response_cache
+from .clients import acall_with_retries, get_async_client, get_backends, get_breaker, make_async_client
+
+
+class LatencyHistogram:
+    BUCKETS = (0.25, 0.5, 0.75, 1, 1.5, 2, 3, 4, 6, 8, 10, 15, 20, 30, 45, 60, 90, 120)
+    MAX_SAMPLES = 1000
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            self.total += 1
+            if self.total > self.MAX_SAMPLES:
+                self.counts = [count // 2 for count in self.counts]
+                self.total = sum(self.counts)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        with self._lock:
+            if not self.total:
+                return None
+            threshold = self.total * percent / 100
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= threshold:
+                    return self.BUCKETS[i] if i < len(self.BUCKETS) else self.BUCKETS[-1] * 2
+        return None
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.total,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class Router:
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name in get_backends()}
+        self._clients = {}
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name='llm-router', daemon=True).start()
+
+    def choose(self) -> list:
+        backends = [
+            backend for backend in get_backends().values()
+            if not get_breaker(backend['NAME']).is_open
+        ] or list(get_backends().values())
+
+        weights = []
+        for backend in backends:
+            median = self.histograms[backend['NAME']].percentile(50) or 1
+            weights.append(backend.get('WEIGHT', 1) / median)
+
+        primary = random.choices(backends, weights=weights)[0]
+        others = sorted(
+            (backend for backend in backends if backend is not primary),
+            key=lambda backend: self.histograms[backend['NAME']].percentile(50) or 0,
+        )
+        return [primary] + others
+
+    def hedge_delay(self, backend: dict) -> float:
+        config = settings.LLM_ROUTER
+        histogram = self.histograms[backend['NAME']]
+        if histogram.total < config['MIN_SAMPLES']:
+            return config['HEDGE_DEFAULT_DELAY']
+        return max(histogram.percentile(config['HEDGE_PERCENTILE']), config['HEDGE_MIN_DELAY'])
+
+    def complete(self, messages: list, temperature: float) -> str:
+        return asyncio.run_coroutine_threadsafe(self.acomplete(messages, temperature), self._loop).result()
+
+    async def acomplete(self, messages: list, temperature: float) -> str:
+        config = settings.LLM_ROUTER
+        backends = self.choose()
+        primary = backends[0]
+        if len(backends) > 1:
+            secondary = backends[1]
+        else:
+            secondary = primary if config['HEDGE_SAME_BACKEND'] else None
+        if not config['HEDGE_ENABLED'] or secondary is None:
+            return await self._call(primary, messages, temperature)
+
+        hedge_delay = self.hedge_delay(primary)
+        pending = {asyncio.ensure_future(self._call(primary, messages, temperature))}
+        hedged = False
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=None if hedged else hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+
+                if not hedged:
+                    pending.add(asyncio.ensure_future(self._call(secondary, messages, temperature)))
+                    hedged = True
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
 
-def generate_answer(messages: list, temperature=0.7) -> str:
+    async def _call(self, backend: dict, messages: list, temperature: float) -> str:
+        started = time.monotonic()
+        try:
+            completion = await acall_with_retries(
+                self._client(backend['NAME']).chat.completions.create,
+                backend=backend['NAME'],
+                model=backend['MODEL'],
+                temperature=temperature,
+                messages=messages,
+            )
+        finally:
+            self.histograms[backend['NAME']].record(time.monotonic() - started)
+        return completion.choices[0].message.content
+
+    def _client(self, backend: str):
+        if backend not in self._clients:
+            self._clients[backend] = make_async_client(backend)
+        return self._clients[backend]
+
+    def stats(self) -> dict:
+        return {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> Router:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = Router()
+    return _router
+
+
+def generate_answer(messages: list, temperature=0.7, task: Optional[str] = None,
+                    validate: Optional[Callable[[str], object]] = None) -> str:
+    return get_response_cache().get_or_generate(
+        task, messages, settings.OPENAI_MODEL, temperature,
+        lambda: _complete(messages, temperature),
+        validate,
+    )
+
+
+def _complete(messages: list, temperature: float) -> str:
     try:
-        completion = settings.OPENAI_CLIENT.chat.completions.create(
-            model=settings.OPENAI_MODEL,
+        return get_router().complete(messages, temperature)
+
+    except OpenAIError as e:
+        raise RuntimeError(f"Ошибка OpenAI: {str(e)}")
+
+
+async def stream_answer(messages: list, temperature=0.7) -> AsyncIterator[str]:
+    backend = get_router().choose()[0]
+    try:
+        stream = await acall_with_retries(
+            get_async_client(backend['NAME']).chat.completions.create,
+            backend=backend['NAME'],
+            model=backend['MODEL'],
             temperature=temperature,
             messages=messages,
+            stream=True,
         )
-        return completion.choices[0].message.content
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
     except OpenAIError as e:
         raise RuntimeError(f"Ошибка OpenAI: {str(e)}")
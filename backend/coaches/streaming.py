@@ -0,0 +1,114 @@
+import json
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+def sse_event(data, event: Optional[str] = None) -> str:
+    payload = json.dumps(data, ensure_ascii=False, cls=DjangoJSONEncoder)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+
+async def authenticate(request):
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except APIException:
+        return None
+    return result[0] if result else None
+
+
+def sse_response(events) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class IncrementalJSONParser:
+    def __init__(self, items_key: str):
+        self.items_key = items_key
+        self.buffer = ""
+        self.fields = {}
+        self.items = []
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._expect_key = False
+        self._key = None
+        self._items_depth = None
+        self._item_start = None
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        events = []
+
+        while self._pos < len(self.buffer):
+            char = self.buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        value = json.loads(self.buffer[self._string_start:self._pos + 1])
+                        if self._expect_key:
+                            self._key = value
+                        else:
+                            self.fields[self._key] = value
+                            events.append(("field", self._key, value))
+
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._key == self.items_key:
+                    self._items_depth = self._depth + 1
+                elif char == "{" and self._depth == self._items_depth:
+                    self._item_start = self._pos
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._depth == self._items_depth and self._item_start is not None:
+                    try:
+                        item = json.loads(self.buffer[self._item_start:self._pos + 1])
+                    except ValueError:
+                        item = None
+                    self._item_start = None
+                    if item is not None:
+                        self.items.append(item)
+                        events.append(("item", item))
+                elif char == "]" and self._depth == 1 and self._items_depth is not None:
+                    self._items_depth = None
+
+            elif self._depth == 1 and char == ",":
+                self._expect_key = True
+
+            elif self._depth == 1 and char == ":":
+                self._expect_key = False
+
+            self._pos += 1
+
+        return events
+
+    def result(self) -> dict:
+        text = self.buffer.strip()
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            return json.loads(text[start:end + 1])
+        except ValueError:
+            return {**self.fields, self.items_key: self.items}
@@ -1,3 +1,502 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, patch
 
-# Create your tests here.
+import httpx
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from openai import APIConnectionError, OpenAI
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+
+from .cache import LocMemBackend, ResponseCache, make_key
+from .clients import CircuitBreaker, CircuitOpenError, acall_with_retries
+from .conversations import build_messages, compact
+from .management.commands.llm_stub_server import WORKOUT_PLAN, make_server
+from .models import Conversation, GenerationJob, Message, PlanPoolEntry
+from .pool import iter_segments, refill_segment, take_plan
+from .services import LatencyHistogram, Router
+from .streaming import IncrementalJSONParser
+from .utils import TASK_MESSAGES
+
+
+async def fake_stream_answer(messages, temperature=0.7):
+    for token in ["При", "вет", "!"]:
+        yield token
+
+
+class CoachesStreamTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.stream_url = reverse('coaches-generate-stream')
+        self.auth_header = f"Bearer {RefreshToken.for_user(self.user).access_token}"
+
+    async def read_stream(self, response):
+        return b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+    @patch('coaches.views.stream_answer', fake_stream_answer)
+    async def test_stream_answer(self):
+        response = await self.async_client.post(
+            self.stream_url,
+            {"messages": [{"role": "user", "content": "Привет"}]},
+            content_type="application/json",
+            headers={"Authorization": self.auth_header},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        body = await self.read_stream(response)
+        self.assertIn('data: {"token": "При"}', body)
+        self.assertIn('event: done\ndata: {"answer": "Привет!"}', body)
+
+    async def test_stream_requires_auth(self):
+        response = await self.async_client.post(
+            self.stream_url,
+            {"messages": [{"role": "user", "content": "Привет"}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_requires_messages(self):
+        response = await self.async_client.post(
+            self.stream_url,
+            {},
+            content_type="application/json",
+            headers={"Authorization": self.auth_header},
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    messages = [{"role": "system", "content": "Составь  тренировку\n"}]
+
+    def make_cache(self, variants=1, max_entries=10):
+        return ResponseCache(LocMemBackend(max_entries), timeouts={"workout": 60}, variants=variants)
+
+    def test_key_is_normalized(self):
+        self.assertEqual(
+            make_key(self.messages, "gpt", 0.7),
+            make_key([{"role": "System", "content": "Составь тренировку"}], "gpt", 0.7),
+        )
+        self.assertNotEqual(make_key(self.messages, "gpt", 0.7), make_key(self.messages, "gpt", 0.2))
+
+    def test_hit_and_miss(self):
+        cache = self.make_cache()
+        answers = iter(["first", "second"])
+
+        self.assertEqual(cache.get_or_generate("workout", self.messages, "gpt", 0.7, lambda: next(answers)), "first")
+        self.assertEqual(cache.get_or_generate("workout", self.messages, "gpt", 0.7, lambda: next(answers)), "first")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_task_without_timeout_is_not_cached(self):
+        cache = self.make_cache()
+        answers = iter(["first", "second"])
+
+        cache.get_or_generate(None, self.messages, "gpt", 0.7, lambda: next(answers))
+        self.assertEqual(cache.get_or_generate(None, self.messages, "gpt", 0.7, lambda: next(answers)), "second")
+
+    def test_variants(self):
+        cache = self.make_cache(variants=2)
+        answers = iter(["first", "second", "third"])
+
+        for _ in range(2):
+            cache.get_or_generate("workout", self.messages, "gpt", 0.7, lambda: next(answers))
+        for _ in range(5):
+            self.assertIn(
+                cache.get_or_generate("workout", self.messages, "gpt", 0.7, lambda: next(answers)),
+                ["first", "second"],
+            )
+
+    def test_invalid_answer_is_not_cached(self):
+        cache = self.make_cache()
+        answers = iter(["не json", '{"title": "Силовая"}'])
+
+        with self.assertRaises(ValueError):
+            cache.get_or_generate("workout", self.messages, "gpt", 0.7, lambda: next(answers), json.loads)
+        self.assertEqual(
+            cache.get_or_generate("workout", self.messages, "gpt", 0.7, lambda: next(answers), json.loads),
+            '{"title": "Силовая"}',
+        )
+
+    def test_lru_eviction(self):
+        backend = LocMemBackend(max_entries=2)
+        backend.set("a", ["a"], 60)
+        backend.set("b", ["b"], 60)
+        backend.get("a")
+        backend.set("c", ["c"], 60)
+
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("a"), ["a"])
+
+    def test_expiration(self):
+        backend = LocMemBackend()
+        backend.set("a", ["a"], -1)
+        self.assertIsNone(backend.get("a"))
+
+
+@patch('coaches.pool.generate_answer')
+class PlanPoolTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            goal='weight_loss',
+            fitness_level='beginner',
+            gender='female',
+            has_equipment=False
+        )
+        self.segment = {
+            'goal': 'weight_loss',
+            'fitness_level': 'beginner',
+            'has_equipment': False,
+            'gender': 'female',
+        }
+
+    def test_segments_cover_profile_choices(self, mock_generate):
+        segments = list(iter_segments())
+        self.assertEqual(len(segments), 4 * 3 * 2 * 2)
+        self.assertIn(self.segment, segments)
+
+    def test_refill_and_take(self, mock_generate):
+        mock_generate.return_value = json.dumps({"title": "Кардио", "exercises": []})
+
+        self.assertEqual(refill_segment('workout', self.segment, size=3), 3)
+        self.assertEqual(refill_segment('workout', self.segment, size=3), 0)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(take_plan(self.user, 'workout'), {"title": "Кардио", "exercises": []})
+        self.assertEqual(PlanPoolEntry.objects.count(), 2)
+        self.assertEqual(len(callbacks), 0)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            take_plan(self.user, 'workout')
+        self.assertEqual(len(callbacks), 1)
+
+    def test_empty_pool(self, mock_generate):
+        with self.captureOnCommitCallbacks():
+            self.assertIsNone(take_plan(self.user, 'nutrition'))
+
+    def test_refill_rejects_invalid_plan(self, mock_generate):
+        mock_generate.return_value = json.dumps({"title": "Без упражнений"})
+
+        with self.assertRaises(ValueError):
+            refill_segment('workout', self.segment, size=1)
+        self.assertFalse(PlanPoolEntry.objects.exists())
+
+
+@override_settings(COACH_CONVERSATION={**settings.COACH_CONVERSATION, 'TOKEN_BUDGET': 20, 'KEEP_TOKENS': 10})
+class ConversationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.conversation = Conversation.objects.create(user=self.user)
+        self.messages_url = reverse('conversations-messages', args=[self.conversation.id])
+
+    @patch('coaches.conversations.generate_answer', return_value="Пейте больше воды.")
+    def test_send_message(self, mock_generate):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.messages_url, {"content": "Как восстановиться?"})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['role'], 'assistant')
+        self.assertEqual(response.data['content'], "Пейте больше воды.")
+        self.assertEqual(len(callbacks), 0)
+
+        sent = mock_generate.call_args.kwargs['messages']
+        self.assertEqual(sent[0]['role'], 'system')
+        self.assertEqual(sent[1:], [{"role": "user", "content": "Как восстановиться?"}])
+
+        response = self.client.get(self.messages_url)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_empty_message(self):
+        response = self.client.post(self.messages_url, {"content": "  "})
+        self.assertEqual(response.status_code, 400)
+
+    @patch('coaches.conversations.generate_answer', side_effect=RuntimeError("недоступно"))
+    def test_failed_reply_saves_nothing(self, mock_generate):
+        response = self.client.post(self.messages_url, {"content": "Как восстановиться?"})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(self.conversation.messages.exists())
+
+    @patch('coaches.conversations.generate_answer', return_value="Пейте больше воды.")
+    def test_compaction_scheduled_once(self, mock_generate):
+        cache.clear()
+        with self.captureOnCommitCallbacks() as callbacks:
+            for i in range(3):
+                self.client.post(self.messages_url, {"content": f"вопрос {i} " * 10})
+        self.assertEqual(len(callbacks), 1)
+
+    @patch('coaches.conversations.generate_answer', return_value="Краткое содержание")
+    def test_compact(self, mock_generate):
+        for i in range(4):
+            Message.objects.create(conversation=self.conversation, role='user', content=f"вопрос {i} " * 4)
+        compact(self.conversation.id)
+
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.summary, "Краткое содержание")
+        self.assertEqual(self.conversation.messages.filter(is_compacted=False).count(), 1)
+
+        messages = build_messages(self.conversation)
+        self.assertEqual(len(messages), 3)
+        self.assertIn("Краткое содержание", messages[1]['content'])
+
+
+class GenerationJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_stale_job_is_failed(self):
+        job = GenerationJob.objects.create(user=self.user, task='workout', status=GenerationJob.Status.RUNNING)
+        GenerationJob.objects.filter(id=job.id).update(updated_at=now() - timedelta(hours=1))
+
+        response = self.client.get(reverse('coaches-job', args=[job.id]))
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertTrue(response.data['error'])
+
+    def test_wait_is_capped(self):
+        job = GenerationJob.objects.create(user=self.user, task='workout')
+
+        started = time.monotonic()
+        with override_settings(GENERATION_JOB_MAX_WAIT=0.3):
+            response = self.client.get(reverse('coaches-job', args=[job.id]), {'wait': 60})
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertLess(time.monotonic() - started, 2)
+
+
+@override_settings(LLM_CLIENT={
+    'MAX_RETRIES': 2, 'BACKOFF_BASE': 0, 'BACKOFF_MAX': 0, 'BREAKER_THRESHOLD': 3, 'BREAKER_RESET_TIMEOUT': 60,
+})
+class ResilienceTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        patcher = patch('coaches.clients.get_breaker', return_value=self.breaker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.error = APIConnectionError(request=httpx.Request('POST', 'http://llm'))
+
+    async def test_retries_transient_errors(self):
+        func = AsyncMock(side_effect=[self.error, "ok"])
+        self.assertEqual(await acall_with_retries(func), "ok")
+        self.assertEqual(func.call_count, 2)
+        self.assertFalse(self.breaker.is_open)
+
+    async def test_gives_up_after_max_retries(self):
+        func = AsyncMock(side_effect=self.error)
+        with self.assertRaises(APIConnectionError):
+            await acall_with_retries(func)
+        self.assertEqual(func.call_count, 3)
+
+    async def test_breaker_fails_fast(self):
+        with self.assertRaises(APIConnectionError):
+            await acall_with_retries(AsyncMock(side_effect=self.error))
+        self.assertTrue(self.breaker.is_open)
+
+        func = AsyncMock(return_value="ok")
+        with self.assertRaises(CircuitOpenError):
+            await acall_with_retries(func)
+        func.assert_not_called()
+
+    async def test_half_open_admits_one_trial(self):
+        self.breaker.reset_timeout = 0
+        with self.assertRaises(APIConnectionError):
+            await acall_with_retries(AsyncMock(side_effect=self.error))
+
+        started = asyncio.Event()
+
+        async def trial():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        first = asyncio.ensure_future(acall_with_retries(trial))
+        await started.wait()
+        with self.assertRaises(CircuitOpenError):
+            await acall_with_retries(AsyncMock(return_value="ok"))
+        self.assertEqual(await first, "ok")
+        self.assertFalse(self.breaker.is_open)
+
+    async def test_failed_trial_reopens(self):
+        self.breaker.failures = 3
+        self.breaker.opened_at = time.monotonic() - 61
+        with self.assertRaises(TypeError):
+            await acall_with_retries(AsyncMock(side_effect=TypeError))
+        self.assertFalse(self.breaker.is_open)
+
+        func = AsyncMock(side_effect=self.error)
+        with self.assertRaises(CircuitOpenError):
+            await acall_with_retries(func)
+        self.assertEqual(func.call_count, 1)
+        self.assertTrue(self.breaker.is_open)
+
+
+@override_settings(
+    LLM_BACKENDS=[
+        {'NAME': 'slow', 'MODEL': 'gpt', 'API_KEY': 'x', 'WEIGHT': 1},
+        {'NAME': 'fast', 'MODEL': 'gpt', 'API_KEY': 'x', 'WEIGHT': 1},
+    ],
+    LLM_ROUTER={
+        'HEDGE_ENABLED': True, 'HEDGE_PERCENTILE': 95, 'HEDGE_MIN_DELAY': 0.05,
+        'HEDGE_DEFAULT_DELAY': 0.05, 'MIN_SAMPLES': 20, 'HEDGE_SAME_BACKEND': False,
+    },
+)
+class RouterTests(SimpleTestCase):
+    def setUp(self):
+        self.cancelled = []
+
+    async def fake_call(self, backend, messages, temperature):
+        try:
+            await asyncio.sleep(1 if backend['NAME'] == 'slow' else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled.append(backend['NAME'])
+            raise
+        return backend['NAME']
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for seconds in [0.1] * 90 + [5] * 10:
+            histogram.record(seconds)
+        self.assertEqual(histogram.percentile(50), 0.25)
+        self.assertEqual(histogram.percentile(95), 6)
+
+    def test_hedged_request_wins_and_loser_is_cancelled(self):
+        router = Router()
+        slow, fast = settings.LLM_BACKENDS
+        with patch.object(router, 'choose', return_value=[slow, fast]), \
+                patch.object(router, '_call', side_effect=self.fake_call):
+            started = time.monotonic()
+            self.assertEqual(router.complete([], 0.7), 'fast')
+            self.assertLess(time.monotonic() - started, 0.5)
+            time.sleep(0.05)
+        self.assertEqual(self.cancelled, ['slow'])
+
+    def test_cancelled_and_failed_calls_are_recorded(self):
+        router = Router()
+        slow, fast = settings.LLM_BACKENDS
+
+        async def create(**kwargs):
+            if kwargs['model'] == 'slow':
+                await asyncio.sleep(1)
+            return Mock(choices=[Mock(message=Mock(content='fast'))])
+
+        def client(name):
+            return Mock(chat=Mock(completions=Mock(create=create)))
+
+        with patch.object(router, 'choose', return_value=[{**slow, 'MODEL': 'slow'}, fast]), \
+                patch.object(router, '_client', side_effect=client):
+            self.assertEqual(router.complete([], 0.7), 'fast')
+            time.sleep(0.05)
+        self.assertEqual(router.histograms['slow'].total, 1)
+        self.assertEqual(router.histograms['fast'].total, 1)
+
+    def test_failed_primary_falls_back(self):
+        router = Router()
+        slow, fast = settings.LLM_BACKENDS
+        with patch.object(router, 'choose', return_value=[slow, fast]), \
+                patch.object(router, '_call', new=AsyncMock(side_effect=[RuntimeError("down"), 'fast'])):
+            self.assertEqual(router.complete([], 0.7), 'fast')
+
+    def test_single_backend_is_not_hedged(self):
+        router = Router()
+        slow = settings.LLM_BACKENDS[0]
+        with patch.object(router, 'choose', return_value=[slow]), \
+                patch.object(router, '_call', side_effect=self.fake_call) as call:
+            self.assertEqual(router.complete([], 0.7), 'slow')
+        self.assertEqual(call.call_count, 1)
+
+    def test_choose_prefers_fast_backend(self):
+        router = Router()
+        for _ in range(50):
+            router.histograms['slow'].record(20)
+            router.histograms['fast'].record(0.5)
+
+        primaries = [router.choose()[0]['NAME'] for _ in range(200)]
+        self.assertGreater(primaries.count('fast'), 150)
+
+
+class IncrementalJSONParserTests(SimpleTestCase):
+    plan = (
+        '```json\n{"title": "Круговая \\"огонь\\"", "exercises": ['
+        '{"name": "Берпи", "sets": 3, "reps": 10, "description": "Руки {вверх}"}, '
+        '{"name": "Планка", "sets": 2, "reps": 1, "tags": ["core"]}'
+        ']}\n```'
+    )
+
+    def test_items_are_emitted_when_closed(self):
+        parser = IncrementalJSONParser(items_key="exercises")
+        events = []
+        for i in range(0, len(self.plan), 7):
+            events += parser.feed(self.plan[i:i + 7])
+
+        self.assertEqual(events[0], ("field", "title", 'Круговая "огонь"'))
+        self.assertEqual([event[1]["name"] for event in events[1:]], ["Берпи", "Планка"])
+        self.assertEqual(parser.result()["exercises"][1]["tags"], ["core"])
+
+    def test_result_survives_malformed_tail(self):
+        parser = IncrementalJSONParser(items_key="exercises")
+        parser.feed('{"title": "Сила", "exercises": [{"name": "Жим"}, {"name": "Тяга"}, {"na')
+
+        self.assertEqual(parser.result(), {"title": "Сила", "exercises": [{"name": "Жим"}, {"name": "Тяга"}]})
+
+
+class StubLLMServerTests(SimpleTestCase):
+    def setUp(self):
+        self.server = make_server(
+            '127.0.0.1', 0, latency_distribution='fixed', latency_mean=0, latency_sigma=0,
+            chunk_rate=0, chunk_size=8, error_rate=0,
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = OpenAI(api_key='stub', base_url=f"http://127.0.0.1:{self.server.server_port}/v1", max_retries=0)
+
+    def test_completion_returns_canned_plan(self):
+        completion = self.client.chat.completions.create(
+            model='stub',
+            messages=[{"role": "system", "content": TASK_MESSAGES["workout"]}],
+        )
+        self.assertEqual(json.loads(completion.choices[0].message.content), WORKOUT_PLAN)
+
+    def test_router_completes_through_async_client(self):
+        backend = {
+            'NAME': 'stub', 'MODEL': 'stub', 'API_KEY': 'stub', 'WEIGHT': 1,
+            'BASE_URL': f"http://127.0.0.1:{self.server.server_port}/v1",
+        }
+        with override_settings(LLM_BACKENDS=[backend], OPENAI_PROXY=None):
+            answer = Router().complete([{"role": "system", "content": TASK_MESSAGES["workout"]}], 0.7)
+        self.assertEqual(json.loads(answer), WORKOUT_PLAN)
+
+    def test_streaming_completion(self):
+        stream = self.client.chat.completions.create(
+            model='stub',
+            messages=[{"role": "user", "content": "Привет"}],
+            stream=True,
+        )
+        chunks = [chunk.choices[0].delta.content for chunk in stream]
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue("".join(chunks).startswith("Для восстановления"))
@@ -1,7 +1,14 @@
-from django.urls import path
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
 
-from .views import CoachesGenerateView
+from .views import CoachesGenerateView, CoachesGenerateStreamView, ConversationViewSet, GenerationJobView
+
+router = DefaultRouter()
+router.register('conversations', ConversationViewSet, basename='conversations')
 
 urlpatterns = [
     path("generate/", CoachesGenerateView.as_view(), name="coaches-generate"),
+    path("generate/stream/", CoachesGenerateStreamView.as_view(), name="coaches-generate-stream"),
+    path("jobs/<int:pk>/", GenerationJobView.as_view(), name="coaches-job"),
+    path("", include(router.urls)),
 ]
@@ -1,6 +1,124 @@
 from typing import Optional
 from users.models import CustomUser
 
+TASK_MESSAGES = {
+    "nutrition": (
+        "\nСоставь креативный и разнообразный рацион на один день, основываясь на параметрах клиента.\n"
+        "Комбинируй продукты из разных категорий: мясо, рыба, яйца, овощи, фрукты, крупы, бобовые, орехи, "
+        "молочные продукты, масла. Вариации питания: мясоед, палео, средиземноморская, белковая, вегетарианская, кето.\n\n"
+        "Подход к выбору зависит от цели:\n"
+        "- Похудение: высокий белок, клетчатка, умеренные углеводы, низкий жир\n"
+        "- Масса: калорийность выше, акцент на углеводы и белки\n"
+        "- Поддержание/форма: сбалансированный рацион по БЖУ\n\n"
+        "Используй разные кухни мира (русская, азиатская, европейская, латиноамериканская) и чередуй блюда.\n"
+        "Избегай повторов из предыдущих дней. Миксуй ингредиенты и технику приготовления (запекание, варка, гриль).\n\n"
+        "Калорийность минимум:\n"
+        "- Похудение: 1500 ккал\n"
+        "- Поддержание: 2000 ккал\n"
+        "- Масса: 3000 ккал\n\n"
+        "Формат:\n"
+        "- 3 приёма пищи: завтрак, обед, ужин\n"
+        "- Для каждого: 2–4 блюда или ингредиента, граммы, калории, белки, жиры, углеводы\n"
+        "- Итог по дню: калории, БЖУ\n\n"
+        "Формат JSON:\n"
+        "{\n"
+        "  \"meals\": {\n"
+        "    \"breakfast\": {\"items\": [\"продукт1\", \"продукт2\"], \"grams\": [0, 0], \"calories\": 0, "
+        "\"proteins\": 0, \"fats\": 0, \"carbs\": 0},\n"
+        "    \"lunch\": {...},\n"
+        "    \"dinner\": {...}\n"
+        "  },\n"
+        "  \"calories\": 0\n"
+        "}\n\n"
+        "Каждый рацион должен отличаться. Не пиши объяснений — только JSON."
+    ),
+    "workout": (
+        "\nСоставь интересную и нестандартную тренировку на один день, основываясь на цели и уровне клиента.\n"
+        "Варианты стилей: функциональная, круговая, HIIT, силовая, гибридная, йога-силовая, стабилизирующая, сплит.\n\n"
+        "Выбор типа зависит от цели:\n"
+        "- Похудение и выносливость: интенсивные, короткие интервалы, круговые/HIIT, плиометрика\n"
+        "- Масса: прогрессивные сплиты (верх/низ, грудь/спина и т.д.) с контролем объёма\n"
+        "- Общая форма: фуллбади с упором на баланс, координацию и базу\n\n"
+        "Учитывай наличие или отсутствие оборудования. Добавляй нестандартные упражнения (болгарские приседы, альпинисты, тяга в наклоне, планка с отведением и т.д.).\n"
+        "Старайся, чтобы тренировки были уникальными. Избегай шаблонов и однотипных подходов.\n\n"
+        "Формат JSON:\n"
+        "{\n"
+        "  \"title\": \"Название тренировки\",\n"
+        "  \"exercises\": [\n"
+        "    {\"name\": \"упражнение1\", \"sets\": 0, \"reps\": 0, \"description\": \"описание техники\"},\n"
+        "    ...\n"
+        "  ]\n"
+        "}\n\n"
+        "Каждый план должен отличаться. Отвечай **только JSON**, без пояснений."
+    ),
+    "nutrition_week": (
+        "\nСоставь креативный и разнообразный рацион на 7 дней подряд, основываясь на параметрах клиента.\n"
+        "Комбинируй продукты из разных категорий и разные кухни мира, не повторяй блюда в течение недели.\n\n"
+        "Подход к выбору зависит от цели:\n"
+        "- Похудение: высокий белок, клетчатка, умеренные углеводы, низкий жир\n"
+        "- Масса: калорийность выше, акцент на углеводы и белки\n"
+        "- Поддержание/форма: сбалансированный рацион по БЖУ\n\n"
+        "Калорийность минимум:\n"
+        "- Похудение: 1500 ккал\n"
+        "- Поддержание: 2000 ккал\n"
+        "- Масса: 3000 ккал\n\n"
+        "Для каждого дня — 3 приёма пищи: завтрак, обед, ужин; для каждого 2–4 блюда или ингредиента, "
+        "граммы, калории, белки, жиры, углеводы, и итог по дню.\n\n"
+        "Формат JSON (в массиве \"days\" ровно 7 элементов, по порядку дней):\n"
+        "{\n"
+        "  \"days\": [\n"
+        "    {\n"
+        "      \"meals\": {\n"
+        "        \"breakfast\": {\"items\": [\"продукт1\", \"продукт2\"], \"grams\": [0, 0], \"calories\": 0, "
+        "\"proteins\": 0, \"fats\": 0, \"carbs\": 0},\n"
+        "        \"lunch\": {...},\n"
+        "        \"dinner\": {...}\n"
+        "      },\n"
+        "      \"calories\": 0\n"
+        "    },\n"
+        "    ...\n"
+        "  ]\n"
+        "}\n\n"
+        "Не пиши объяснений — только JSON."
+    ),
+    "workout_week": (
+        "\nСоставь программу тренировок на 7 дней подряд, основываясь на цели и уровне клиента.\n"
+        "Чередуй стили (функциональная, круговая, HIIT, силовая, гибридная, йога-силовая, стабилизирующая, сплит) "
+        "и нагрузку на группы мышц, предусмотри лёгкие восстановительные дни.\n\n"
+        "Выбор типа зависит от цели:\n"
+        "- Похудение и выносливость: интенсивные, короткие интервалы, круговые/HIIT, плиометрика\n"
+        "- Масса: прогрессивные сплиты (верх/низ, грудь/спина и т.д.) с контролем объёма\n"
+        "- Общая форма: фуллбади с упором на баланс, координацию и базу\n\n"
+        "Учитывай наличие или отсутствие оборудования. Не повторяй одинаковые тренировки в течение недели.\n\n"
+        "Формат JSON (в массиве \"days\" ровно 7 элементов, по порядку дней):\n"
+        "{\n"
+        "  \"days\": [\n"
+        "    {\n"
+        "      \"title\": \"Название тренировки\",\n"
+        "      \"exercises\": [\n"
+        "        {\"name\": \"упражнение1\", \"sets\": 0, \"reps\": 0, \"description\": \"описание техники\"},\n"
+        "        ...\n"
+        "      ]\n"
+        "    },\n"
+        "    ...\n"
+        "  ]\n"
+        "}\n\n"
+        "Отвечай **только JSON**, без пояснений."
+    ),
+}
+
+CHAT_MESSAGE = (
+    "\nТы консультируешь клиента исключительно по вопросам питания, тренировок и образа жизни.\n"
+    "Не обсуждай темы, не связанные со здоровьем, физической активностью или диетой.\n"
+    "Все рекомендации должны быть персонализированы с учётом параметров клиента и его цели.\n"
+    "Фокусируйся только на практических советах по тренировкам, рациону, восстановлению, сна и образу жизни.\n\n"
+    "Если клиент просит составить конкретный план питания или тренировок — не составляй его сам.\n"
+    "Вежливо сообщи, что персонализированные планы можно получить в соответствующих разделах приложения:\n"
+    "- Раздел 'Тренировки' — для генерации плана тренировок\n"
+    "- Раздел 'Питание' — для генерации плана питания\n"
+    "Отвечай кратко и по теме."
+)
+
 
 def get_system_message(user: CustomUser, task: Optional[str] = None) -> dict:
     username = user.username
@@ -25,70 +143,20 @@ def get_system_message(user: CustomUser, task: Optional[str] = None) -> dict:
         f"Наличие оборудования: {'да' if has_equipment else 'нет'}.\n"
     )
 
-    if task == "nutrition":
-        message = base_message + (
-            "\nСоставь креативный и разнообразный рацион на один день, основываясь на параметрах клиента.\n"
-            "Комбинируй продукты из разных категорий: мясо, рыба, яйца, овощи, фрукты, крупы, бобовые, орехи, "
-            "молочные продукты, масла. Вариации питания: мясоед, палео, средиземноморская, белковая, вегетарианская, кето.\n\n"
-            "Подход к выбору зависит от цели:\n"
-            "- Похудение: высокий белок, клетчатка, умеренные углеводы, низкий жир\n"
-            "- Масса: калорийность выше, акцент на углеводы и белки\n"
-            "- Поддержание/форма: сбалансированный рацион по БЖУ\n\n"
-            "Используй разные кухни мира (русская, азиатская, европейская, латиноамериканская) и чередуй блюда.\n"
-            "Избегай повторов из предыдущих дней. Миксуй ингредиенты и технику приготовления (запекание, варка, гриль).\n\n"
-            "Калорийность минимум:\n"
-            "- Похудение: 1500 ккал\n"
-            "- Поддержание: 2000 ккал\n"
-            "- Масса: 3000 ккал\n\n"
-            "Формат:\n"
-            "- 3 приёма пищи: завтрак, обед, ужин\n"
-            "- Для каждого: 2–4 блюда или ингредиента, граммы, калории, белки, жиры, углеводы\n"
-            "- Итог по дню: калории, БЖУ\n\n"
-            "Формат JSON:\n"
-            "{\n"
-            "  \"meals\": {\n"
-            "    \"breakfast\": {\"items\": [\"продукт1\", \"продукт2\"], \"grams\": [0, 0], \"calories\": 0, "
-            "\"proteins\": 0, \"fats\": 0, \"carbs\": 0},\n"
-            "    \"lunch\": {...},\n"
-            "    \"dinner\": {...}\n"
-            "  },\n"
-            "  \"calories\": 0\n"
-            "}\n\n"
-            "Каждый рацион должен отличаться. Не пиши объяснений — только JSON."
-        )
+    return {"role": "system", "content": base_message + TASK_MESSAGES.get(task, CHAT_MESSAGE)}
+
 
-    elif task == "workout":
-        message = base_message + (
-            "\nСоставь интересную и нестандартную тренировку на один день, основываясь на цели и уровне клиента.\n"
-            "Варианты стилей: функциональная, круговая, HIIT, силовая, гибридная, йога-силовая, стабилизирующая, сплит.\n\n"
-            "Выбор типа зависит от цели:\n"
-            "- Похудение и выносливость: интенсивные, короткие интервалы, круговые/HIIT, плиометрика\n"
-            "- Масса: прогрессивные сплиты (верх/низ, грудь/спина и т.д.) с контролем объёма\n"
-            "- Общая форма: фуллбади с упором на баланс, координацию и базу\n\n"
-            "Учитывай наличие или отсутствие оборудования. Добавляй нестандартные упражнения (болгарские приседы, альпинисты, тяга в наклоне, планка с отведением и т.д.).\n"
-            "Старайся, чтобы тренировки были уникальными. Избегай шаблонов и однотипных подходов.\n\n"
-            "Формат JSON:\n"
-            "{\n"
-            "  \"title\": \"Название тренировки\",\n"
-            "  \"exercises\": [\n"
-            "    {\"name\": \"упражнение1\", \"sets\": 0, \"reps\": 0, \"description\": \"описание техники\"},\n"
-            "    ...\n"
-            "  ]\n"
-            "}\n\n"
-            "Каждый план должен отличаться. Отвечай **только JSON**, без пояснений."
-        )
+def get_segment_message(segment: dict, task: str) -> dict:
+    goal = CustomUser.FitnessGoal(segment["goal"]).label
+    fitness_level = CustomUser.FitnessLevel(segment["fitness_level"]).label
 
-    else:
-        message = base_message + (
-            "\nТы консультируешь клиента исключительно по вопросам питания, тренировок и образа жизни.\n"
-            "Не обсуждай темы, не связанные со здоровьем, физической активностью или диетой.\n"
-            "Все рекомендации должны быть персонализированы с учётом параметров клиента и его цели.\n"
-            "Фокусируйся только на практических советах по тренировкам, рациону, восстановлению, сна и образу жизни.\n\n"
-            "Если клиент просит составить конкретный план питания или тренировок — не составляй его сам.\n"
-            "Вежливо сообщи, что персонализированные планы можно получить в соответствующих разделах приложения:\n"
-            "- Раздел 'Тренировки' — для генерации плана тренировок\n"
-            "- Раздел 'Питание' — для генерации плана питания\n"
-            "Отвечай кратко и по теме."
-        )
+    base_message = (
+        f"Ты — профессиональный персональный фитнес-тренер.\n"
+        f"Цель: {goal}.\n"
+        f"Уровень физической подготовки: {fitness_level}.\n"
+        f"Параметры:\n"
+        f"- Пол: {segment['gender']}\n"
+        f"Наличие оборудования: {'да' if segment['has_equipment'] else 'нет'}.\n"
+    )
 
-    return {"role": "system", "content": message}
+    return {"role": "system", "content": base_message + TASK_MESSAGES[task]}
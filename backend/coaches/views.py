@@ -1,8 +1,22 @@
-from rest_framework import status, generics
+import json
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status, generics, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .services import generate_answer
+from .conversations import reply, schedule_compaction
+from .jobs import fail_stale_jobs
+from .models import Conversation, GenerationJob
+from .serializers import ConversationSerializer, GenerationJobSerializer, MessageSerializer
+from .services import generate_answer, stream_answer
+from .streaming import authenticate, sse_event, sse_response
 from .utils import get_system_message
 
 
@@ -26,3 +40,98 @@ class CoachesGenerateView(generics.CreateAPIView):
             return Response({"answer": answer}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class CoachesGenerateStreamView(View):
+    async def post(self, request, *args, **kwargs):
+        user = await authenticate(request)
+        if user is None:
+            return JsonResponse(
+                {"error": "Учетные данные не были предоставлены."},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        try:
+            messages = json.loads(request.body or b"{}").get("messages")
+        except (ValueError, AttributeError):
+            messages = None
+
+        if not messages or not isinstance(messages, list):
+            return JsonResponse(
+                {"error": "Поле 'messages' обязательно и должно быть списком."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        system_message = get_system_message(user)
+        full_messages = [system_message] + messages
+
+        async def events():
+            answer = []
+            try:
+                async for token in stream_answer(messages=full_messages):
+                    answer.append(token)
+                    yield sse_event({"token": token})
+                yield sse_event({"answer": "".join(answer)}, event="done")
+            except Exception as e:
+                yield sse_event({"error": str(e)}, event="error")
+
+        return sse_response(events())
+
+
+class GenerationJobView(generics.RetrieveAPIView):
+    serializer_class = GenerationJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return GenerationJob.objects.filter(user=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        job = self.get_object()
+        if not job.is_finished and fail_stale_jobs(GenerationJob.objects.filter(id=job.id)):
+            job.refresh_from_db()
+
+        try:
+            wait = min(float(request.query_params.get("wait", 0)), settings.GENERATION_JOB_MAX_WAIT)
+        except ValueError:
+            wait = 0
+        deadline = time.monotonic() + wait
+
+        while not job.is_finished and time.monotonic() < deadline:
+            time.sleep(settings.GENERATION_JOB_POLL_INTERVAL)
+            job.refresh_from_db()
+
+        return Response(self.get_serializer(job).data)
+
+
+class ConversationViewSet(viewsets.ModelViewSet):
+    serializer_class = ConversationSerializer
+    permission_classes = [IsAuthenticated]
+    ordering_fields = ['updated_at', 'created_at']
+    ordering = ['-updated_at']
+
+    def get_queryset(self):
+        return Conversation.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=True, methods=['get', 'post'])
+    def messages(self, request, pk=None):
+        conversation = self.get_object()
+
+        if request.method == 'GET':
+            page = self.paginate_queryset(conversation.messages.order_by('created_at', 'id'))
+            return self.get_paginated_response(MessageSerializer(page, many=True).data)
+
+        serializer = MessageSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            message = reply(conversation, serializer.validated_data['content'])
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        schedule_compaction(conversation)
+
+        return Response(MessageSerializer(message).data, status=status.HTTP_201_CREATED)
@@ -2,8 +2,6 @@ from datetime import timedelta
 from pathlib import Path
 
 import environ
-import httpx
-from openai import OpenAI
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 ENV_FILE = BASE_DIR / '.env'
@@ -22,6 +20,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework_simplejwt',
@@ -33,7 +32,8 @@ INSTALLED_APPS = [
     'progress',
     'workouts',
     'nutrition',
-    'blog'
+    'blog',
+    'uploads',
 ]
 
 REST_FRAMEWORK = {
@@ -95,6 +95,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'main.wsgi.application'
 
+CACHES = {
+    'default': env.cache('CACHE_URL', default='dbcache://django_cache'),
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -131,6 +135,20 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {'BACKEND': 'uploads.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+MEDIA_SERVING = {
+    'PRIVATE_PREFIXES': ['progress_images/'],
+    'SIGNED_URL_MAX_AGE': env.int('MEDIA_SIGNED_URL_MAX_AGE', default=3600),
+    'SENDFILE_BACKEND': env('MEDIA_SENDFILE_BACKEND', default=None),
+    'X_ACCEL_PREFIX': env('MEDIA_X_ACCEL_PREFIX', default='/protected-media/'),
+    'MAX_AGE': env.int('MEDIA_MAX_AGE', default=3600),
+    'IMMUTABLE_MAX_AGE': 31536000,
+}
+
 # Create media directories if they don't exist
 MEDIA_DIRS = [
     MEDIA_ROOT / 'avatars',
@@ -147,11 +165,124 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.CustomUser'
 
-OPENAI_MODEL = env('OPENAI_MODEL')
-OPENAI_CLIENT = OpenAI(
-    api_key=env('OPENAI_API_KEY'),
-    http_client=httpx.Client(
-        proxy=f"http://{env('PROXY_LOGIN')}:{env('PROXY_PASSWORD')}@{env('PROXY_HOST')}:{env('PROXY_PORT')}",
-        transport=httpx.HTTPTransport(local_address="0.0.0.0")
-    )
+OPENAI_MODEL = env('OPENAI_MODEL', default='gpt-4o-mini')
+OPENAI_API_KEY = env('OPENAI_API_KEY', default='')
+OPENAI_PROXY = (
+    f"http://{env('PROXY_LOGIN')}:{env('PROXY_PASSWORD')}@{env('PROXY_HOST')}:{env('PROXY_PORT')}"
+    if env('PROXY_HOST', default=None) else None
 )
+
+LLM_CLIENT = {
+    'MAX_CONNECTIONS': env.int('LLM_MAX_CONNECTIONS', default=20),
+    'MAX_KEEPALIVE_CONNECTIONS': env.int('LLM_MAX_KEEPALIVE_CONNECTIONS', default=10),
+    'KEEPALIVE_EXPIRY': 30,
+    'CONNECT_TIMEOUT': env.float('LLM_CONNECT_TIMEOUT', default=5),
+    'TIMEOUT': env.float('LLM_TIMEOUT', default=60),
+    'MAX_RETRIES': env.int('LLM_MAX_RETRIES', default=2),
+    'BACKOFF_BASE': 0.5,
+    'BACKOFF_MAX': 8,
+    'BREAKER_THRESHOLD': env.int('LLM_BREAKER_THRESHOLD', default=5),
+    'BREAKER_RESET_TIMEOUT': env.float('LLM_BREAKER_RESET_TIMEOUT', default=30),
+}
+
+LLM_BACKENDS = [
+    {
+        'NAME': 'default',
+        'MODEL': OPENAI_MODEL,
+        'BASE_URL': env('OPENAI_BASE_URL', default=None),
+        'API_KEY': OPENAI_API_KEY,
+        'WEIGHT': 1,
+    },
+]
+
+LLM_ROUTER = {
+    'HEDGE_ENABLED': env.bool('LLM_HEDGE_ENABLED', default=True),
+    'HEDGE_PERCENTILE': 95,
+    'HEDGE_MIN_DELAY': 1.0,
+    'HEDGE_DEFAULT_DELAY': 15.0,
+    'MIN_SAMPLES': 20,
+    'HEDGE_SAME_BACKEND': env.bool('LLM_HEDGE_SAME_BACKEND', default=False),
+}
+
+GENERATION_WORKERS = env.int('GENERATION_WORKERS', default=4)
+GENERATION_JOB_MAX_WAIT = env.float('GENERATION_JOB_MAX_WAIT', default=5)
+GENERATION_JOB_TIMEOUT = env.int('GENERATION_JOB_TIMEOUT', default=60 * 10)
+GENERATION_JOB_POLL_INTERVAL = 0.5
+GENERATION_JOB_HANDLERS = {
+    'workout': 'workouts.services.save_generated_workout',
+    'nutrition': 'nutrition.services.save_generated_nutrition',
+}
+
+LLM_CACHE = {
+    'BACKEND': env('LLM_CACHE_BACKEND', default='locmem'),
+    'CACHE_ALIAS': 'default',
+    'MAX_ENTRIES': env.int('LLM_CACHE_MAX_ENTRIES', default=1024),
+    'VARIANTS': env.int('LLM_CACHE_VARIANTS', default=3),
+    'TIMEOUTS': {
+        'workout': env.int('LLM_CACHE_WORKOUT_TTL', default=60 * 60 * 6),
+        'nutrition': env.int('LLM_CACHE_NUTRITION_TTL', default=60 * 60 * 6),
+    },
+}
+
+PLAN_POOL = {
+    'ENABLED': env.bool('PLAN_POOL_ENABLED', default=True),
+    'SIZE': env.int('PLAN_POOL_SIZE', default=5),
+    'LOW_WATER': env.int('PLAN_POOL_LOW_WATER', default=2),
+    'MAX_AGE': timedelta(days=env.int('PLAN_POOL_MAX_AGE_DAYS', default=7)),
+    'GENDERS': ['male', 'female'],
+    'WORKERS': env.int('PLAN_POOL_WORKERS', default=2),
+}
+
+SINGLE_FLIGHT = {
+    'CACHE_ALIAS': 'default',
+    'LOCK_TIMEOUT': env.int('SINGLE_FLIGHT_LOCK_TIMEOUT', default=120),
+    'FOLLOWER_WAIT': env.int('SINGLE_FLIGHT_FOLLOWER_WAIT', default=10),
+    'RESULT_TTL': 60,
+    'IDEMPOTENCY_TTL': env.int('IDEMPOTENCY_KEY_TTL', default=60 * 60 * 24),
+    'POLL_INTERVAL': 0.2,
+}
+
+COACH_CONVERSATION = {
+    'TOKEN_BUDGET': env.int('COACH_CONVERSATION_TOKEN_BUDGET', default=3000),
+    'KEEP_TOKENS': env.int('COACH_CONVERSATION_KEEP_TOKENS', default=1000),
+    'CACHE_ALIAS': 'default',
+    'COMPACTION_TIMEOUT': 60 * 5,
+}
+
+BLOG_FEED = {
+    'COMMENT_PREVIEW_SIZE': env.int('BLOG_FEED_COMMENT_PREVIEW_SIZE', default=3),
+    'CACHE_ENABLED': env.bool('BLOG_FEED_CACHE_ENABLED', default=True),
+    'CACHE_ALIAS': 'default',
+    'CACHE_TIMEOUT': env.int('BLOG_FEED_CACHE_TIMEOUT', default=300),
+    'LIKE_STATUS_MAX_IDS': 500,
+    'MODERATION_MAX_IDS': 10000,
+}
+
+BLOG_TRENDING = {
+    'HALF_LIFE_HOURS': env.float('BLOG_TRENDING_HALF_LIFE_HOURS', default=24),
+    'WINDOW_DAYS': env.int('BLOG_TRENDING_WINDOW_DAYS', default=7),
+    'LIKE_WEIGHT': 1.0,
+    'COMMENT_WEIGHT': 2.0,
+}
+
+BLOG_EVENTS = {
+    'BACKEND': env('BLOG_EVENTS_BACKEND', default='blog.events.PostgresBroker'),
+    'OPTIONS': {},
+    'HEARTBEAT_INTERVAL': 15,
+    'MAX_STREAM_SECONDS': env.int('BLOG_EVENTS_MAX_STREAM_SECONDS', default=300),
+    'MAX_POSTS': 100,
+}
+
+IMAGE_PIPELINE = {
+    'WIDTHS': [160, 320, 640, 1280],
+    'JPEG_QUALITY': env.int('IMAGE_PIPELINE_JPEG_QUALITY', default=82),
+    'WEBP_QUALITY': env.int('IMAGE_PIPELINE_WEBP_QUALITY', default=80),
+    'WORKERS': env.int('IMAGE_PIPELINE_WORKERS', default=2),
+}
+
+PROGRESS_ANALYTICS = {
+    'DEFAULT_PERIOD': 'week',
+    'DEFAULT_WINDOW': 4,
+    'MAX_WINDOW': 90,
+    'MAX_PROJECTION_DAYS': 3650,
+}
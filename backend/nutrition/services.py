@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils.timezone import localtime, now
+
+from .models import Nutrition
+
+WEEK_DAYS = 7
+
+
+def nutrition_payload(nutrition: Nutrition) -> dict:
+    return {
+        "id": nutrition.id,
+        "date": nutrition.date,
+        "meals": nutrition.meals,
+        "calories": nutrition.calories
+    }
+
+
+def save_generated_nutrition(user, data: dict) -> dict:
+    nutrition = Nutrition.objects.create(
+        user=user,
+        meals=data.get("meals"),
+        calories=data.get("calories")
+    )
+    return nutrition_payload(nutrition)
+
+
+def save_generated_week(user, data: dict) -> list:
+    days = data.get('days')
+    if not isinstance(days, list) or len(days) != WEEK_DAYS:
+        raise ValueError(f"План должен содержать {WEEK_DAYS} дней")
+    for day in days:
+        if not isinstance(day, dict) or not isinstance(day.get('meals'), dict):
+            raise ValueError("У каждого дня должно быть поле 'meals'")
+
+    today = localtime(now()).date()
+    with transaction.atomic():
+        plans = Nutrition.objects.bulk_create([
+            Nutrition(user=user, date=today + timedelta(days=i), meals=day['meals'], calories=day.get('calories'))
+            for i, day in enumerate(days)
+        ])
+    return [nutrition_payload(nutrition) for nutrition in plans]
@@ -1,4 +1,6 @@
+import json
 from datetime import date, timedelta
+from unittest.mock import patch
 
 from django.test import TestCase
 from django.urls import reverse
@@ -87,3 +89,14 @@ class NutritionTests(TestCase):
             self.assertIn('fats', meal)
             self.assertIn('carbs', meal)
             self.assertIsInstance(meal['items'], list)
+
+    @patch('nutrition.views.generate_answer')
+    def test_generate_week(self, mock_generate):
+        day = {"meals": {"breakfast": {"items": ["Овсянка"], "calories": 300}}, "calories": 1800}
+        mock_generate.return_value = json.dumps({"days": [day] * 7})
+
+        response = self.client.post(reverse('nutrition-generate-week'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(Nutrition.objects.filter(calories=1800).count(), 7)
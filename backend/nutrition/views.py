@@ -1,5 +1,8 @@
 import json
 
+from coaches.idempotency import single_flight
+from coaches.jobs import submit_job
+from coaches.pool import generate_plan
 from coaches.services import generate_answer
 from coaches.utils import get_system_message
 from django.utils.timezone import now, localtime
@@ -11,6 +14,7 @@ from rest_framework.response import Response
 
 from .models import Nutrition
 from .serializers import NutritionSerializer
+from .services import nutrition_payload, save_generated_nutrition, save_generated_week
 
 
 class NutritionFilter(filters.FilterSet):
@@ -39,32 +43,33 @@ class NutritionViewSet(viewsets.ModelViewSet):
         today = localtime(now()).date()
         nutrition = self.get_queryset().filter(date=today).order_by('-created_at').first()
         if nutrition:
-            return Response({
-                "id": nutrition.id,
-                "date": nutrition.date,
-                "meals": nutrition.meals,
-                "calories": nutrition.calories,
-            })
+            return Response(nutrition_payload(nutrition))
         return Response({"message": "Нет плана питания на сегодня."}, status=404)
 
     @action(detail=False, methods=['post'])
+    @single_flight('nutrition-generate')
     def generate(self, request):
+        try:
+            data = generate_plan(request.user, "nutrition")
+            return Response(save_generated_nutrition(request.user, data), status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'], url_path='generate-week')
+    @single_flight('nutrition-generate-week')
+    def generate_week(self, request):
         try:
             result = generate_answer(
-                messages=[get_system_message(request.user, "nutrition")],
+                messages=[get_system_message(request.user, "nutrition_week")],
                 temperature=0.7
             )
             data = json.loads(result)
-            nutrition = Nutrition.objects.create(
-                user=request.user,
-                meals=data.get("meals"),
-                calories=data.get("calories")
-            )
-            return Response({
-                "id": nutrition.id,
-                "date": nutrition.date,
-                "meals": nutrition.meals,
-                "calories": nutrition.calories
-            }, status=status.HTTP_201_CREATED)
+            return Response(save_generated_week(request.user, data), status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'], url_path='generate-async')
+    @single_flight('nutrition-generate-async')
+    def generate_async(self, request):
+        job = submit_job(request.user, "nutrition")
+        return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,108 @@
+import math
+from datetime import timedelta
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+
+PERIODS = ('day', 'week', 'month')
+EPOCH_WEEKDAY = 3
+
+
+def body_mass_index(weight, height):
+    meters = np.where(np.greater(height, 0), height, np.nan) / 100
+    return np.round(weight) / meters ** 2
+
+
+def bucket_starts(dates: np.ndarray, period: str) -> np.ndarray:
+    if period == 'month':
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    if period == 'week':
+        weekdays = (dates.astype('int64') + EPOCH_WEEKDAY) % 7
+        return dates - weekdays.astype('timedelta64[D]')
+    return dates
+
+
+def bucket_means(inverse: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    present = ~np.isnan(values)
+    counts = np.bincount(inverse, weights=present, minlength=size)
+    sums = np.bincount(inverse, weights=np.where(present, values, 0), minlength=size)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return sums / counts
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    present = ~np.isnan(values)
+    sums = np.cumsum(np.where(present, values, 0))
+    counts = np.cumsum(present)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return sums / counts
+
+
+def linear_trend(days: np.ndarray, values: np.ndarray) -> Optional[tuple]:
+    present = ~np.isnan(values)
+    if np.unique(days[present]).size < 2:
+        return None
+    slope, intercept = np.polyfit(days[present], values[present], 1)
+    return slope, intercept
+
+
+def projected_day(trend: Optional[tuple], target: Optional[float], last_day: float) -> Optional[int]:
+    if trend is None or target is None or trend[0] == 0:
+        return None
+    slope, intercept = trend
+    day = (target - intercept) / slope
+    if day < last_day or day - last_day > settings.PROGRESS_ANALYTICS['MAX_PROJECTION_DAYS']:
+        return None
+    return round(day)
+
+
+def to_list(values: np.ndarray) -> list:
+    return [None if math.isnan(value) else value for value in np.round(values, 2).tolist()]
+
+
+def progress_analytics(queryset, period: str, window: int, default_height: Optional[int] = None,
+                       target_weight: Optional[float] = None, target_bmi: Optional[float] = None) -> dict:
+    rows = list(queryset.order_by('date').values_list('date', 'weight', 'height'))
+    result = {
+        "period": period,
+        "window": window,
+        "buckets": [],
+        "trend": {"weight": None, "bmi": None},
+        "projections": {"weight": None, "bmi": None},
+    }
+    if not rows:
+        return result
+
+    dates, weights, heights = zip(*rows)
+    dates = np.array(dates, dtype='datetime64[D]')
+    weights = np.array(weights, dtype=float)
+    heights = np.array(heights, dtype=float)
+    if default_height:
+        heights = np.where(np.isnan(heights), default_height, heights)
+    bmi = body_mass_index(weights, heights)
+
+    origin = dates[0]
+    days = (dates - origin).astype(float)
+    starts, inverse, counts = np.unique(bucket_starts(dates, period), return_inverse=True, return_counts=True)
+    bucket_days = (starts - origin).astype(float)
+
+    columns = {"date": [str(start) for start in starts.tolist()], "count": counts.tolist()}
+    for name, values, target in (('weight', weights, target_weight), ('bmi', bmi, target_bmi)):
+        means = bucket_means(inverse, values, starts.size)
+        trend = linear_trend(days, values)
+        columns[name] = to_list(means)
+        columns[f'{name}_avg'] = to_list(moving_average(means, window))
+        columns[f'{name}_trend'] = to_list(
+            trend[0] * bucket_days + trend[1] if trend else np.full(starts.size, np.nan)
+        )
+        if trend:
+            result["trend"][name] = {"slope_per_week": round(float(trend[0]) * 7, 3)}
+            day = projected_day(trend, target, days[-1])
+            if day is not None:
+                result["projections"][name] = origin.item() + timedelta(days=day)
+
+    result["buckets"] = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    return result
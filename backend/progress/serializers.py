@@ -1,15 +1,38 @@
+from django.conf import settings
 from rest_framework import serializers
+from uploads.serializers import ImageVariantsField, SignedImageField
 
+from .analytics import PERIODS
 from .models import ProgressChart
 
 
 class ProgressChartSerializer(serializers.ModelSerializer):
     bmi = serializers.SerializerMethodField()
+    photo = SignedImageField(required=False, allow_null=True)
+    photo_variants = ImageVariantsField()
 
     class Meta:
         model = ProgressChart
-        fields = ['id', 'user', 'date', 'weight', 'height', 'photo', 'notes', 'created_at', 'bmi']
+        fields = ['id', 'user', 'date', 'weight', 'height', 'photo', 'photo_variants', 'notes', 'created_at', 'bmi']
         read_only_fields = ['user', 'created_at', ]
 
     def get_bmi(self, obj):
         return obj.calculate_bmi()
+
+
+class ProgressAnalyticsQuerySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(choices=PERIODS, default=settings.PROGRESS_ANALYTICS['DEFAULT_PERIOD'])
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    window = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.PROGRESS_ANALYTICS['MAX_WINDOW'],
+        default=settings.PROGRESS_ANALYTICS['DEFAULT_WINDOW'],
+    )
+    target_weight = serializers.FloatField(min_value=20, max_value=500, required=False)
+    target_bmi = serializers.FloatField(min_value=10, max_value=80, required=False)
+
+    def validate(self, attrs):
+        if 'start' in attrs and 'end' in attrs and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError("Дата начала должна быть не позже даты окончания.")
+        return attrs
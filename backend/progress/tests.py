@@ -1,3 +1,83 @@
+from datetime import date, timedelta
+
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import CustomUser
+
+from .models import ProgressChart
+
+
+class ProgressAnalyticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            height=200
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('progress-analytics')
+        self.start = date(2025, 1, 6)
+        ProgressChart.objects.bulk_create([
+            ProgressChart(user=self.user, date=self.start + timedelta(days=i), weight=100 - i * 0.5, notes='')
+            for i in range(28)
+        ])
+
+    def test_weekly_buckets(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'period': 'week', 'window': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        buckets = response.data['buckets']
+        self.assertEqual([bucket['date'] for bucket in buckets], ['2025-01-06', '2025-01-13', '2025-01-20', '2025-01-27'])
+        self.assertEqual([bucket['count'] for bucket in buckets], [7, 7, 7, 7])
+        self.assertEqual(buckets[0]['weight'], 98.5)
+        self.assertEqual(buckets[1]['weight'], 95.0)
+        self.assertEqual(buckets[1]['weight_avg'], 96.75)
+        self.assertEqual(buckets[0]['bmi'], 24.64)
+        self.assertEqual(buckets[0]['weight_trend'], 100.0)
+        self.assertEqual(response.data['trend']['weight']['slope_per_week'], -3.5)
+
+    def test_monthly_buckets_and_range(self):
+        response = self.client.get(self.url, {'period': 'month', 'start': '2025-01-20', 'end': '2025-02-10'})
+        buckets = response.data['buckets']
+        self.assertEqual([bucket['date'] for bucket in buckets], ['2025-01-01', '2025-02-01'])
+        self.assertEqual(sum(bucket['count'] for bucket in buckets), 14)
+
+    def test_projected_goal_dates(self):
+        response = self.client.get(self.url, {'target_weight': 80, 'target_bmi': 19})
+        self.assertEqual(response.data['projections']['weight'], self.start + timedelta(days=40))
+        self.assertEqual(response.data['projections']['bmi'], self.start + timedelta(days=48))
+
+        response = self.client.get(self.url, {'target_weight': 120})
+        self.assertIsNone(response.data['projections']['weight'])
+
+    def test_missing_values_and_empty_history(self):
+        ProgressChart.objects.create(user=self.user, date=date(2025, 3, 3), weight=None, notes='')
+        response = self.client.get(self.url, {'period': 'day', 'start': '2025-03-01'})
+        self.assertEqual(response.data['buckets'], [
+            {'date': '2025-03-03', 'count': 1, 'weight': None, 'weight_avg': None, 'weight_trend': None,
+             'bmi': None, 'bmi_avg': None, 'bmi_trend': None}
+        ])
+        self.assertIsNone(response.data['trend']['weight'])
+
+        response = self.client.get(self.url, {'start': '2026-01-01'})
+        self.assertEqual(response.data['buckets'], [])
+
+    def test_bmi_matches_entries_and_skips_zero_height(self):
+        entry = ProgressChart.objects.create(user=self.user, date=date(2025, 3, 3), weight=80.6, height=181, notes='')
+        ProgressChart.objects.create(user=self.user, date=date(2025, 3, 4), weight=80, height=0, notes='')
+        self.user.height = None
+        self.user.save()
+
+        response = self.client.get(self.url, {'period': 'day', 'start': '2025-03-01'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([bucket['bmi'] for bucket in response.data['buckets']], [entry.calculate_bmi(), None])
 
-# Create your tests here.
+    def test_validation(self):
+        self.assertEqual(self.client.get(self.url, {'period': 'year'}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'start': '2025-02-01', 'end': '2025-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,9 +1,12 @@
 from django_filters import rest_framework as filters
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from .analytics import progress_analytics
 from .models import ProgressChart
-from .serializers import ProgressChartSerializer
+from .serializers import ProgressChartSerializer, ProgressAnalyticsQuerySerializer
 
 
 class ProgressFilter(filters.FilterSet):
@@ -26,3 +29,16 @@ class ProgressViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        params = ProgressAnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        options = dict(params.validated_data)
+
+        queryset = ProgressChart.objects.filter(user=request.user)
+        if 'start' in options:
+            queryset = queryset.filter(date__gte=options.pop('start'))
+        if 'end' in options:
+            queryset = queryset.filter(date__lte=options.pop('end'))
+        return Response(progress_analytics(queryset, default_height=request.user.height, **options))
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import Blob
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'ref_count', 'created_at', 'updated_at')
+    search_fields = ('name',)
+    ordering = ('-created_at',)
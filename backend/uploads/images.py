@@ -0,0 +1,155 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from .media import media_url
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = {
+    'users.CustomUser': ('avatar', 'avatar_variants'),
+    'blog.Post': ('image', 'image_variants'),
+    'progress.ProgressChart': ('photo', 'photo_variants'),
+}
+
+SAVE_FORMATS = {'JPEG': 'JPEG', 'MPO': 'JPEG', 'PNG': 'PNG', 'WEBP': 'WEBP'}
+
+image_processed = Signal()
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_PIPELINE['WORKERS'],
+    thread_name_prefix='image-pipeline',
+)
+
+
+def needs_processing(instance) -> bool:
+    field_name, variants_field = IMAGE_FIELDS[instance._meta.label]
+    name = getattr(instance, field_name).name or None
+    variants = getattr(instance, variants_field) or {}
+    return name != variants.get('source')
+
+
+def schedule_processing(instance) -> None:
+    args = (instance._meta.label, instance.pk)
+    transaction.on_commit(lambda: _executor.submit(_worker, *args))
+
+
+def _worker(label: str, pk) -> None:
+    close_old_connections()
+    try:
+        process_image(label, pk)
+    except Exception:
+        logger.exception("Не удалось обработать изображение %s #%s", label, pk)
+    finally:
+        connection.close()
+
+
+def process_image(label: str, pk) -> Optional[dict]:
+    model = apps.get_model(label)
+    field_name, variants_field = IMAGE_FIELDS[label]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_processing(instance):
+        return None
+
+    file = getattr(instance, field_name)
+    old_variants = getattr(instance, variants_field) or {}
+    name = file.name or ''
+    variants = build_variants(file.storage, name) if name else {}
+
+    current = Q(**{field_name: name}) if name else Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True})
+    updated = model.objects.filter(current, pk=pk).update(**{
+        field_name: variants.get('source', name),
+        variants_field: variants,
+    })
+    if not updated:
+        delete_variants(file.storage, variants, keep=variants.get('source'))
+        return None
+
+    delete_variants(file.storage, old_variants, keep=variants.get('source'))
+    image_processed.send(sender=model, instance_pk=pk, variants=variants)
+    return variants
+
+
+def build_variants(storage, name: str) -> dict:
+    with storage.open(name, 'rb') as f:
+        image = Image.open(f)
+        image_format = image.format
+        image.load()
+        has_exif = bool(image.getexif())
+
+    image = ImageOps.exif_transpose(image)
+    config = settings.IMAGE_PIPELINE
+    source = name
+
+    if has_exif and image_format in SAVE_FORMATS:
+        content = encode(image, SAVE_FORMATS[image_format], config['JPEG_QUALITY'])
+        storage.delete(name)
+        source = storage.save(name, ContentFile(content))
+
+    root = os.path.splitext(source)[0]
+    sizes = {}
+    for width in sorted({min(width, image.width) for width in config['WIDTHS']}):
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        sizes[str(width)] = {
+            'jpeg': storage.save(f"{root}_{width}w.jpg", ContentFile(
+                encode(resized, 'JPEG', config['JPEG_QUALITY'])
+            )),
+            'webp': storage.save(f"{root}_{width}w.webp", ContentFile(
+                encode(resized, 'WEBP', config['WEBP_QUALITY'])
+            )),
+        }
+
+    return {'source': source, 'width': image.width, 'height': image.height, 'sizes': sizes}
+
+
+def encode(image: Image.Image, image_format: str, quality: int) -> bytes:
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=quality, optimize=image_format != 'WEBP')
+    return buffer.getvalue()
+
+
+def variant_names(variants: Optional[dict]) -> list:
+    return [name for size in (variants or {}).get('sizes', {}).values() for name in size.values()]
+
+
+def delete_variants(storage, variants: dict, keep: Optional[str] = None) -> None:
+    for name in variant_names(variants):
+        if name != keep:
+            storage.delete(name)
+
+
+def variant_urls(variants: Optional[dict], request=None) -> Optional[dict]:
+    sizes = (variants or {}).get('sizes')
+    if not sizes:
+        return None
+
+    def url(name):
+        return media_url(name, request)
+
+    widths = sorted(sizes, key=int)
+    return {
+        'thumbnail': url(sizes[widths[0]]['jpeg']),
+        'srcset': ", ".join(f"{url(sizes[width]['jpeg'])} {width}w" for width in widths),
+        'webp_srcset': ", ".join(f"{url(sizes[width]['webp'])} {width}w" for width in widths),
+    }
+
+
+def thumbnail_url(variants: Optional[dict]) -> Optional[str]:
+    urls = variant_urls(variants)
+    return urls['thumbnail'] if urls else None
@@ -0,0 +1,79 @@
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from uploads.images import IMAGE_FIELDS, variant_names
+from uploads.models import Blob
+from uploads.storage import TEMP_DIR, is_blob_name
+
+
+def referenced_names() -> Counter:
+    refs = Counter()
+    for label, (field_name, variants_field) in IMAGE_FIELDS.items():
+        rows = apps.get_model(label).objects.values_list(field_name, variants_field)
+        for name, variants in rows.iterator():
+            names = {name} if name else set()
+            names.update(variant_names(variants))
+            refs.update(names)
+    return refs
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает ссылки на загруженные файлы и удаляет файлы, на которые никто не ссылается'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=60,
+                            help='Не трогать файлы, изменённые за последние N минут')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет удалено')
+
+    def handle(self, *args, **options):
+        cutoff = now() - timedelta(minutes=options['grace'])
+        refs = referenced_names()
+
+        recounted = deleted = freed = 0
+        stale = Blob.objects.filter(updated_at__lt=cutoff)
+        for blob in stale.only('name', 'size', 'ref_count').iterator():
+            count = refs.get(blob.name, 0)
+            if options['dry_run'] and count == 0:
+                deleted += 1
+                freed += blob.size
+            if blob.ref_count != count:
+                if not options['dry_run']:
+                    stale.filter(id=blob.id).update(ref_count=count)
+                recounted += 1
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                for blob in stale.select_for_update(skip_locked=True).filter(ref_count=0):
+                    default_storage.purge(blob.name)
+                    blob.delete()
+                    deleted += 1
+                    freed += blob.size
+
+        known = set(Blob.objects.values_list('name', flat=True))
+        strays = 0
+        for name, path in iter_files(default_storage.location):
+            if os.path.getmtime(path) > cutoff.timestamp():
+                continue
+            if name.startswith(f"{TEMP_DIR}/") or (is_blob_name(name) and name not in known):
+                if not options['dry_run']:
+                    os.remove(path)
+                strays += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Пересчитано ссылок: {recounted}, удалено файлов: {deleted} ({freed} байт), "
+            f"удалено потерянных файлов: {strays}"
+        ))
+
+
+def iter_files(root):
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            yield os.path.relpath(path, root).replace(os.sep, '/'), path
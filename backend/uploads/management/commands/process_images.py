@@ -0,0 +1,34 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from uploads.images import IMAGE_FIELDS, needs_processing, process_image
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает уже загруженные изображения: удаляет EXIF, создаёт миниатюры и WebP-версии'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=list(IMAGE_FIELDS), help='Обработать только одну модель')
+        parser.add_argument('--force', action='store_true', help='Пересоздать варианты даже если они уже есть')
+
+    def handle(self, *args, **options):
+        labels = [options['model']] if options['model'] else list(IMAGE_FIELDS)
+
+        for label in labels:
+            model = apps.get_model(label)
+            field_name, variants_field = IMAGE_FIELDS[label]
+            queryset = model.objects.exclude(Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True}))
+            if options['force']:
+                queryset.update(**{variants_field: {}})
+
+            processed = 0
+            for instance in queryset.only('pk', field_name, variants_field).iterator():
+                if not needs_processing(instance):
+                    continue
+                try:
+                    process_image(label, instance.pk)
+                    processed += 1
+                except Exception as e:
+                    self.stderr.write(f"{label} #{instance.pk}: {e}")
+            self.stdout.write(self.style.SUCCESS(f"{label}: обработано изображений {processed}"))
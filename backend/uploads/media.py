@@ -0,0 +1,56 @@
+from typing import Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+
+SIGNER_SALT = 'uploads.media'
+
+
+def is_private(name: str) -> bool:
+    return name.startswith(tuple(settings.MEDIA_SERVING['PRIVATE_PREFIXES']))
+
+
+def sign_name(name: str) -> str:
+    signed = signing.TimestampSigner(salt=SIGNER_SALT).sign(name)
+    return signed[len(name) + 1:]
+
+
+def check_token(name: str, token: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=SIGNER_SALT).unsign(
+            f"{name}:{token}", max_age=settings.MEDIA_SERVING['SIGNED_URL_MAX_AGE']
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def media_url(name: str, request=None) -> str:
+    url = default_storage.url(name)
+    if is_private(name):
+        url = f"{url}?{urlencode({'token': sign_name(name)})}"
+    return request.build_absolute_uri(url) if request else url
+
+
+def parse_range(header: str, size: int) -> Optional[tuple]:
+    unit, _, ranges = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in ranges:
+        return None
+
+    start, _, end = ranges.strip().partition('-')
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                raise ValueError
+            return max(size - length, 0), size - 1
+        first = int(start)
+        last = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return ()
+
+    if first >= size or last < first:
+        return ()
+    return first, last
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from .images import variant_urls
+from .media import media_url
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get('request'))
+
+
+class SignedImageField(serializers.ImageField):
+    def to_representation(self, value):
+        if not value:
+            return None
+        return media_url(value.name, self.context.get('request'))
@@ -0,0 +1,25 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .images import IMAGE_FIELDS, needs_processing, schedule_processing, variant_names
+
+
+def schedule_image_processing(sender, instance, raw=False, **kwargs):
+    if not raw and needs_processing(instance):
+        schedule_processing(instance)
+
+
+def release_images(sender, instance, **kwargs):
+    field_name, variants_field = IMAGE_FIELDS[instance._meta.label]
+    file = getattr(instance, field_name)
+    names = {file.name} if file else set()
+    names.update(variant_names(getattr(instance, variants_field)))
+    for name in names:
+        file.storage.delete(name)
+
+
+for label in IMAGE_FIELDS:
+    post_save.connect(schedule_image_processing, sender=apps.get_model(label),
+                      dispatch_uid=f'uploads-images-{label}')
+    post_delete.connect(release_images, sender=apps.get_model(label),
+                        dispatch_uid=f'uploads-release-{label}')
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils.timezone import now
+
+from .models import Blob
+
+HASHED_NAME = re.compile(r'/[0-9a-f]{2}/[0-9a-f]{64}$')
+BLOB_NAME = re.compile(r'^(?P<directory>.+/)?(?P<prefix>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})(\.\w+)?$')
+TEMP_DIR = '.tmp'
+
+
+def is_hashed(name: str) -> bool:
+    return bool(HASHED_NAME.search(os.path.splitext(name)[0]))
+
+
+def blob_digest(name: str) -> str | None:
+    match = BLOB_NAME.match(name)
+    if match and match['digest'].startswith(match['prefix']):
+        return match['digest']
+    return None
+
+
+def is_blob_name(name: str) -> bool:
+    return blob_digest(name) is not None
+
+
+def blob_name(name: str, digest: str) -> str:
+    directory = posixpath.dirname(name)
+    extension = os.path.splitext(name)[1].lower()
+    return posixpath.join(directory, digest[:2], f"{digest}{extension}")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        temp_path, digest, size = self._write_temp(content)
+        name = blob_name(name, digest)
+        try:
+            with transaction.atomic():
+                self._claim(name, size)
+                full_path = self.path(name)
+                if not os.path.exists(full_path):
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    os.replace(temp_path, full_path)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def delete(self, name):
+        released = Blob.objects.filter(name=name).update(
+            ref_count=Greatest(F('ref_count') - 1, 0), updated_at=now()
+        )
+        if not released:
+            super().delete(name)
+
+    def purge(self, name):
+        super().delete(name)
+
+    def _write_temp(self, content) -> tuple:
+        directory = self.path(TEMP_DIR)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temp:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temp.write(chunk)
+                size += len(chunk)
+        return temp.name, digest.hexdigest(), size
+
+    def _claim(self, name: str, size: int) -> None:
+        updated = Blob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=now())
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                Blob.objects.create(name=name, size=size, ref_count=1)
+        except IntegrityError:
+            Blob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=now())
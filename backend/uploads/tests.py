@@ -0,0 +1,232 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from blog.models import Post
+from users.models import CustomUser
+
+from progress.models import ProgressChart
+
+from .images import process_image
+from .media import media_url
+from .models import Blob
+from .storage import is_hashed
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_photo(width=2000, height=1000, orientation=None, color='red') -> SimpleUploadedFile:
+    image = Image.new('RGB', (width, height), color)
+    exif = Image.Exif()
+    exif[0x010F] = 'Phone'
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', exif=exif)
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImagePipelineTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def create_post(self, **kwargs):
+        return Post.objects.create(user=self.user, title='Пост', content='Текст', **kwargs)
+
+    def test_upload_schedules_processing(self):
+        with self.captureOnCommitCallbacks() as without_image:
+            self.create_post()
+        with self.captureOnCommitCallbacks() as with_image:
+            self.create_post(image=make_photo())
+        self.assertEqual(len(with_image), len(without_image) + 1)
+
+    def test_process_strips_exif_and_builds_variants(self):
+        post = self.create_post(image=make_photo(orientation=6))
+        variants = process_image('blog.Post', post.id)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image_variants, variants)
+        self.assertEqual(post.image.name, variants['source'])
+        self.assertEqual(list(variants['sizes']), ['160', '320', '640', '1000'])
+
+        with default_storage.open(post.image.name) as f:
+            original = Image.open(f)
+            self.assertFalse(original.getexif())
+            self.assertEqual(original.size, (1000, 2000))
+
+        with default_storage.open(variants['sizes']['320']['webp']) as f:
+            thumbnail = Image.open(f)
+            self.assertEqual(thumbnail.format, 'WEBP')
+            self.assertEqual(thumbnail.size, (320, 640))
+
+        self.assertIsNone(process_image('blog.Post', post.id))
+
+    def test_small_image_is_not_upscaled(self):
+        post = self.create_post(image=make_photo(200, 100))
+        variants = process_image('blog.Post', post.id)
+        self.assertEqual(list(variants['sizes']), ['160', '200'])
+
+    def test_new_upload_replaces_variants(self):
+        post = self.create_post(image=make_photo())
+        old = process_image('blog.Post', post.id)
+
+        post.refresh_from_db()
+        post.image = make_photo(color='blue')
+        post.save()
+        process_image('blog.Post', post.id)
+
+        self.assertEqual(Blob.objects.get(name=old['sizes']['160']['jpeg']).ref_count, 0)
+        post.refresh_from_db()
+        self.assertEqual(Blob.objects.get(name=post.image_variants['sizes']['160']['jpeg']).ref_count, 1)
+
+    def test_serializer_returns_srcset(self):
+        post = self.create_post(image=make_photo())
+        process_image('blog.Post', post.id)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(reverse('post-detail', kwargs={'pk': post.id}))
+
+        variants = response.data['image_variants']
+        self.assertTrue(variants['thumbnail'].startswith('http://testserver/media/'))
+        self.assertIn(' 1280w', variants['srcset'])
+        self.assertIn('.webp 160w', variants['webp_srcset'])
+
+    def test_backfill_command(self):
+        post = self.create_post(image=make_photo())
+        Post.objects.filter(id=post.id).update(image_variants={})
+
+        call_command('process_images', model='blog.Post', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertIn('1280', post.image_variants['sizes'])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.name = default_storage.save('blog_images/file.txt', io.BytesIO(b'0123456789'))
+
+    def test_identical_uploads_share_one_blob(self):
+        self.assertTrue(is_hashed(self.name))
+        self.assertFalse(is_hashed('blog_images/photo.0123456789ab.jpg'))
+        self.assertRegex(self.name, r'^blog_images/[0-9a-f]{2}/[0-9a-f]{64}\.txt$')
+        self.assertEqual(default_storage.save('blog_images/copy.TXT', io.BytesIO(b'0123456789')), self.name)
+        self.assertEqual(Blob.objects.get(name=self.name).ref_count, 2)
+
+        default_storage.delete(self.name)
+        self.assertTrue(default_storage.exists(self.name))
+        self.assertEqual(Blob.objects.get(name=self.name).ref_count, 1)
+
+    def test_gc_removes_orphans(self):
+        Blob.objects.filter(name=self.name).update(ref_count=5)
+        call_command('gc_media', grace=0, stdout=StringIO())
+        self.assertFalse(default_storage.exists(self.name))
+        self.assertFalse(Blob.objects.filter(name=self.name).exists())
+
+        progress = ProgressChart.objects.create(
+            user=self.user, notes='', photo=SimpleUploadedFile('photo.txt', b'kept')
+        )
+        call_command('gc_media', grace=0, stdout=StringIO())
+        self.assertTrue(default_storage.exists(progress.photo.name))
+        self.assertEqual(Blob.objects.get(name=progress.photo.name).ref_count, 1)
+
+        progress.delete()
+        self.assertEqual(Blob.objects.get(name=progress.photo.name).ref_count, 0)
+
+    def test_gc_dry_run_and_recent_claims_keep_counts(self):
+        Blob.objects.filter(name=self.name).update(ref_count=5)
+        out = StringIO()
+        call_command('gc_media', grace=0, dry_run=True, stdout=out)
+        self.assertIn('Пересчитано ссылок: 1, удалено файлов: 1', out.getvalue())
+        self.assertEqual(Blob.objects.get(name=self.name).ref_count, 5)
+        self.assertTrue(default_storage.exists(self.name))
+
+        call_command('gc_media', grace=60, stdout=StringIO())
+        self.assertEqual(Blob.objects.get(name=self.name).ref_count, 5)
+
+    def test_public_file_with_caching_headers(self):
+        response = self.client.get(f'/media/{self.name}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(b"0123456789").hexdigest()}"')
+
+        os.utime(default_storage.path(self.name), (0, 0))
+        response = self.client.get(f'/media/{self.name}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_byte_ranges(self):
+        response = self.client.get(f'/media/{self.name}', HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+
+        response = self.client.get(f'/media/{self.name}', HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+
+        response = self.client.get(f'/media/{self.name}', HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_private_file_requires_signed_url(self):
+        progress = ProgressChart.objects.create(
+            user=self.user, notes='', photo=SimpleUploadedFile('photo.txt', b'secret')
+        )
+        name = progress.photo.name
+
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 404)
+        self.assertEqual(self.client.get(f'/media/{name}', {'token': 'forged:token'}).status_code, 404)
+
+        response = self.client.get(media_url(name))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Cache-Control'].startswith('private'))
+
+    def test_path_traversal(self):
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+
+    def test_non_canonical_paths_do_not_bypass_privacy(self):
+        progress = ProgressChart.objects.create(
+            user=self.user, notes='', photo=SimpleUploadedFile('photo.txt', b'secret')
+        )
+        name = progress.photo.name
+        relative = name.split('/', 1)[1]
+
+        for url in (
+            f'/media/./{name}',
+            f'/media/avatars/../{name}',
+            f'/media/blog_images/%2E%2E/{name}',
+            f'/media/progress_images//{relative}',
+        ):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    @override_settings(MEDIA_SERVING={**settings.MEDIA_SERVING, 'SENDFILE_BACKEND': 'xaccel'})
+    def test_x_accel_redirect(self):
+        response = self.client.get(f'/media/{self.name}')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual(response.content, b'')
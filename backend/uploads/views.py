@@ -0,0 +1,109 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_http_methods
+
+from .media import check_token, is_private, parse_range
+from .storage import blob_digest, is_hashed
+
+CHUNK_SIZE = 64 * 1024
+
+
+@require_http_methods(['GET', 'HEAD'])
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if os.path.relpath(full_path, os.path.abspath(settings.MEDIA_ROOT)).replace(os.sep, '/') != path:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    private = is_private(path)
+    if private and not (request.user.is_staff or check_token(path, request.GET.get('token', ''))):
+        raise Http404
+
+    stat = os.stat(full_path)
+    etag = entity_tag(path, stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control(path, private),
+        'Accept-Ranges': 'bytes',
+    }
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if conditional is not None:
+        return with_headers(conditional, headers)
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    backend = settings.MEDIA_SERVING['SENDFILE_BACKEND']
+    if backend:
+        response = HttpResponse(content_type=content_type)
+        if backend == 'xaccel':
+            response['X-Accel-Redirect'] = settings.MEDIA_SERVING['X_ACCEL_PREFIX'] + path
+        else:
+            response['X-Sendfile'] = full_path
+        return with_headers(response, headers)
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = parse_range(range_header, stat.st_size)
+
+    if byte_range == ():
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return with_headers(response, headers)
+
+    if byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(full_path, start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(end - start + 1)
+        return with_headers(response, headers)
+
+    return with_headers(FileResponse(open(full_path, 'rb'), content_type=content_type), headers)
+
+
+def entity_tag(path: str, stat: os.stat_result) -> str:
+    digest = blob_digest(path)
+    if digest:
+        return f'"{digest}"'
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def cache_control(path: str, private: bool) -> str:
+    config = settings.MEDIA_SERVING
+    if is_hashed(path):
+        scope = 'private' if private else 'public'
+        return f"{scope}, max-age={config['IMMUTABLE_MAX_AGE']}, immutable"
+    if private:
+        return 'private, no-cache'
+    return f"public, max-age={config['MAX_AGE']}"
+
+
+def read_range(full_path: str, start: int, length: int):
+    with open(full_path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def with_headers(response, headers: dict):
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -42,6 +42,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     has_equipment = models.BooleanField(default=True)
 
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
+from uploads.serializers import ImageVariantsField
 
 User = get_user_model()
 
@@ -29,8 +30,11 @@ class RegisterSerializer(serializers.ModelSerializer):
 
 
 class UserSerializer(serializers.ModelSerializer):
+    avatar_variants = ImageVariantsField()
+
     class Meta:
         model = User
         fields = ['id', 'username', 'email',
-                  'date_of_birth', 'gender', 'height', 'weight', 'goal', 'fitness_level', 'has_equipment', 'avatar']
+                  'date_of_birth', 'gender', 'height', 'weight', 'goal', 'fitness_level', 'has_equipment', 'avatar',
+                  'avatar_variants']
         read_only_fields = ['id', 'username', 'email', ]
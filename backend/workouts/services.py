@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils.timezone import localtime, now
+
+from .models import Workout
+
+WEEK_DAYS = 7
+
+
+def workout_payload(workout: Workout) -> dict:
+    return {
+        "id": workout.id,
+        "title": workout.title,
+        "date": workout.date,
+        "plan": workout.plan,
+        "completed": workout.completed
+    }
+
+
+def validate_workout_plan(data: dict) -> dict:
+    if not isinstance(data.get('title'), str) or not data['title'].strip():
+        raise ValueError("В плане нет названия тренировки")
+    exercises = data.get('exercises')
+    if not isinstance(exercises, list) or not exercises:
+        raise ValueError("В плане нет упражнений")
+    for exercise in exercises:
+        if not isinstance(exercise, dict) or not isinstance(exercise.get('name'), str):
+            raise ValueError("У каждого упражнения должно быть название")
+    return data
+
+
+def save_generated_workout(user, data: dict) -> dict:
+    workout = Workout.objects.create(
+        user=user,
+        title=data['title'],
+        plan=data['exercises']
+    )
+    return workout_payload(workout)
+
+
+def save_generated_week(user, data: dict) -> list:
+    days = data.get('days')
+    if not isinstance(days, list) or len(days) != WEEK_DAYS:
+        raise ValueError(f"План должен содержать {WEEK_DAYS} дней")
+    for day in days:
+        if not isinstance(day, dict) or not day.get('title') or not isinstance(day.get('exercises'), list):
+            raise ValueError("У каждого дня должны быть поля 'title' и 'exercises'")
+
+    today = localtime(now()).date()
+    with transaction.atomic():
+        workouts = Workout.objects.bulk_create([
+            Workout(user=user, date=today + timedelta(days=i), title=day['title'], plan=day['exercises'])
+            for i, day in enumerate(days)
+        ])
+    return [workout_payload(workout) for workout in workouts]
@@ -1,9 +1,16 @@
+import json
+import time
 from datetime import date, timedelta
+from unittest.mock import patch
 
-from django.test import TestCase
+from coaches.jobs import run_job
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 from users.models import CustomUser
 
 from .models import Workout
@@ -18,10 +25,12 @@ class WorkoutTests(TestCase):
             password='testpass123'
         )
         self.client.force_authenticate(user=self.user)
+        cache.clear()
 
         self.list_url = reverse('workouts-list')
         self.generate_url = reverse('workouts-generate')
         self.latest_url = reverse('workouts-latest')
+        self.generate_async_url = reverse('workouts-generate-async')
 
         self.workout1 = Workout.objects.create(
             user=self.user,
@@ -69,3 +78,115 @@ class WorkoutTests(TestCase):
 
         workout = Workout.objects.get(id=self.workout1.id)
         self.assertTrue(workout.completed)
+
+    @patch('coaches.pool.generate_answer')
+    def test_generate_workout_async(self, mock_generate):
+        mock_generate.return_value = json.dumps({
+            "title": "Круговая",
+            "exercises": [{"name": "Берпи", "sets": 3, "reps": 12, "description": "..."}]
+        })
+
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(self.generate_async_url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+
+        job_id = response.data['job_id']
+        run_job(job_id)
+
+        response = self.client.get(reverse('coaches-job', args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['result']['title'], "Круговая")
+        self.assertTrue(Workout.objects.filter(id=response.data['result']['id'], user=self.user).exists())
+
+    @patch('workouts.views.generate_plan')
+    def test_generate_workout_idempotency_key(self, mock_generate):
+        mock_generate.return_value = {"title": "Силовая", "exercises": []}
+
+        first = self.client.post(self.generate_url, HTTP_IDEMPOTENCY_KEY='abc')
+        second = self.client.post(self.generate_url, HTTP_IDEMPOTENCY_KEY='abc')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(mock_generate.call_count, 1)
+        self.assertEqual(Workout.objects.filter(title="Силовая").count(), 1)
+
+    @patch('workouts.views.generate_plan')
+    def test_generate_workout_joins_in_flight_request(self, mock_generate):
+        cache.set(f"flight:{self.user.pk}:workout-generate", 'leader')
+        cache.set("flight-result:leader", (201, {"id": self.workout1.id}))
+
+        response = self.client.post(self.generate_url)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['id'], self.workout1.id)
+        mock_generate.assert_not_called()
+
+    @patch('workouts.views.generate_plan')
+    def test_leader_keeps_lock_taken_over_by_another_request(self, mock_generate):
+        flight_key = f"flight:{self.user.pk}:workout-generate"
+
+        def expire_and_take_over(*args, **kwargs):
+            cache.set(flight_key, 'successor')
+            return {"title": "Силовая", "exercises": []}
+        mock_generate.side_effect = expire_and_take_over
+
+        self.client.post(self.generate_url)
+        self.assertEqual(cache.get(flight_key), 'successor')
+
+    @override_settings(SINGLE_FLIGHT={**settings.SINGLE_FLIGHT, 'FOLLOWER_WAIT': 0.3})
+    @patch('workouts.views.generate_plan')
+    def test_follower_gives_up_after_wait(self, mock_generate):
+        cache.set(f"flight:{self.user.pk}:workout-generate", 'leader')
+
+        started = time.monotonic()
+        response = self.client.post(self.generate_url)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertLess(time.monotonic() - started, 2)
+        mock_generate.assert_not_called()
+
+    @patch('workouts.views.generate_answer')
+    def test_generate_week(self, mock_generate):
+        mock_generate.return_value = json.dumps({
+            "days": [{"title": f"День {i}", "exercises": [{"name": "Планка"}]} for i in range(7)]
+        })
+
+        response = self.client.post(reverse('workouts-generate-week'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(mock_generate.call_count, 1)
+        dates = sorted(Workout.objects.filter(title__startswith="День").values_list('date', flat=True))
+        self.assertEqual(dates, [date.today() + timedelta(days=i) for i in range(7)])
+
+    @patch('workouts.views.generate_answer')
+    def test_generate_week_rejects_incomplete_plan(self, mock_generate):
+        mock_generate.return_value = json.dumps({"days": [{"title": "День", "exercises": []}]})
+
+        response = self.client.post(reverse('workouts-generate-week'))
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertFalse(Workout.objects.filter(title="День").exists())
+
+    @patch('workouts.views.stream_answer')
+    async def test_generate_workout_stream(self, mock_stream):
+        async def tokens(messages):
+            for token in ['{"title": "Кар', 'дио", "exercises": [{"name": "Бег"', '}, {"name": "Прыжки"}]}']:
+                yield token
+        mock_stream.side_effect = tokens
+
+        response = await self.async_client.post(
+            reverse('workouts-generate-stream'),
+            headers={"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"},
+        )
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('event: title\ndata: {"title": "Кардио"}', body)
+        self.assertEqual(body.count('event: exercise'), 2)
+        self.assertIn('event: done', body)
+        self.assertTrue(await Workout.objects.filter(user=self.user, title="Кардио").aexists())
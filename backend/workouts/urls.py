@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import WorkoutViewSet
+from .views import WorkoutViewSet, WorkoutGenerateStreamView
 
 router = DefaultRouter()
 router.register('', WorkoutViewSet, basename='workouts')
 
 urlpatterns = [
+    path('generate/stream/', WorkoutGenerateStreamView.as_view(), name='workouts-generate-stream'),
     path('', include(router.urls)),
 ]
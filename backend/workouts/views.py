@@ -1,8 +1,17 @@
 import json
 
-from coaches.services import generate_answer
+from asgiref.sync import sync_to_async
+from coaches.idempotency import single_flight
+from coaches.jobs import submit_job
+from coaches.pool import generate_plan
+from coaches.services import generate_answer, stream_answer
+from coaches.streaming import IncrementalJSONParser, authenticate, sse_event, sse_response
 from coaches.utils import get_system_message
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
 from django.utils.timezone import now, localtime
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django_filters import rest_framework as filters
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
@@ -11,6 +20,7 @@ from rest_framework.response import Response
 
 from .models import Workout
 from .serializers import WorkoutSerializer
+from .services import save_generated_week, save_generated_workout, validate_workout_plan, workout_payload
 
 
 class WorkoutFilter(filters.FilterSet):
@@ -37,41 +47,71 @@ class WorkoutViewSet(viewsets.ModelViewSet):
         today = localtime(now()).date()
         workout = self.get_queryset().filter(date=today).order_by('-created_at').first()
         if workout:
-            return Response({
-                "id": workout.id,
-                "title": workout.title,
-                "date": workout.date,
-                "plan": workout.plan,
-                "completed": workout.completed
-            })
+            return Response(workout_payload(workout))
         return Response({"message": "Нет тренировки на сегодня."}, status=404)
 
     @action(detail=False, methods=['post'])
+    @single_flight('workout-generate')
     def generate(self, request):
+        try:
+            data = generate_plan(request.user, "workout")
+            return Response(save_generated_workout(request.user, data), status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'], url_path='generate-week')
+    @single_flight('workout-generate-week')
+    def generate_week(self, request):
         try:
             result = generate_answer(
-                messages=[get_system_message(request.user, "workout")],
+                messages=[get_system_message(request.user, "workout_week")],
                 temperature=0.7
             )
             data = json.loads(result)
-            workout = Workout.objects.create(
-                user=request.user,
-                title=data['title'],
-                plan=data['exercises']
-            )
-            return Response({
-                "id": workout.id,
-                "title": workout.title,
-                "date": workout.date,
-                "plan": workout.plan,
-                "completed": workout.completed
-            }, status=status.HTTP_201_CREATED)
+            return Response(save_generated_week(request.user, data), status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'], url_path='generate-async')
+    @single_flight('workout-generate-async')
+    def generate_async(self, request):
+        job = submit_job(request.user, "workout")
+        return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
         workout = self.get_object()
         workout.completed = True
         workout.save()
         return Response({'status': 'Workout completed'}, status=status.HTTP_200_OK)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class WorkoutGenerateStreamView(View):
+    async def post(self, request, *args, **kwargs):
+        user = await authenticate(request)
+        if user is None:
+            return JsonResponse(
+                {"error": "Учетные данные не были предоставлены."},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        messages = [get_system_message(user, "workout")]
+
+        async def events():
+            parser = IncrementalJSONParser(items_key="exercises")
+            try:
+                async for token in stream_answer(messages=messages):
+                    for event in parser.feed(token):
+                        if event[0] == "field" and event[1] == "title":
+                            yield sse_event({"title": event[2]}, event="title")
+                        elif event[0] == "item":
+                            yield sse_event(event[1], event="exercise")
+
+                data = validate_workout_plan(parser.result())
+                workout = await sync_to_async(save_generated_workout)(user, data)
+                yield sse_event(workout, event="done")
+            except Exception as e:
+                yield sse_event({"error": str(e)}, event="error")
+
+        return sse_response(events())
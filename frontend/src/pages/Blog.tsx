@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
-import { apiService } from '../services/api';
-import { PostType, CommentType } from '../types/blog';
+import { apiService, subscribePostEvents } from '../services/api';
+import { PostType, CommentType, PostEventType } from '../types/blog';
 import { Heart, MessageCircle, Plus, Upload, ChevronDown, ChevronUp, Send, Trash2 } from 'lucide-react';
 
 const Blog: React.FC = () => {
@@ -22,6 +22,41 @@ const Blog: React.FC = () => {
     fetchPosts();
   }, []);
 
+  const postIds = posts.map(post => post.id).join(',');
+
+  useEffect(() => {
+    if (!postIds) return;
+
+    const handleEvent = (event: PostEventType) => {
+      if (event.type === 'like' || event.type === 'unlike') {
+        setPosts(prev => prev.map(post =>
+          post.id === event.post_id
+            ? {
+                ...post,
+                likes_count: event.likes_count ?? post.likes_count,
+                is_liked: event.user_id === currentUserId ? event.type === 'like' : post.is_liked
+              }
+            : post
+        ));
+      } else if (event.type === 'comment') {
+        setPosts(prev => prev.map(post =>
+          post.id === event.post_id
+            ? { ...post, comments_count: event.comments_count ?? post.comments_count }
+            : post
+        ));
+        const comment = event.comment;
+        if (comment) {
+          setComments(prev => prev[event.post_id] && !prev[event.post_id].some(item => item.id === comment.id)
+            ? { ...prev, [event.post_id]: [comment, ...prev[event.post_id]] }
+            : prev
+          );
+        }
+      }
+    };
+
+    return subscribePostEvents(postIds.split(',').map(Number), handleEvent);
+  }, [postIds, currentUserId]);
+
   const fetchPosts = async () => {
     try {
       const response = await apiService.getPosts();
@@ -31,10 +66,12 @@ const Blog: React.FC = () => {
           user: {
             id: post.user?.id || 0,
             username: post.user?.username || 'User',
-            avatar: post.user?.avatar || null
+            avatar: post.user?.avatar || null,
+            avatar_thumbnail: post.user?.avatar_thumbnail || null
           },
           comments: post.comments || [],
           likes_count: post.likes_count || 0,
+          comments_count: post.comments_count || 0,
           is_liked: post.is_liked || false
         }));
         setPosts(postsWithDefaults);
@@ -121,14 +158,15 @@ const Blog: React.FC = () => {
       
       setComments(prev => ({
         ...prev,
-        [postId]: [newCommentData, ...(prev[postId] || [])]
+        [postId]: [newCommentData, ...(prev[postId] || []).filter(comment => comment.id !== newCommentData.id)]
       }));
 
       setPosts(prev => prev.map(post => 
         post.id === postId 
           ? {
               ...post,
-              comments: [newCommentData, ...(post.comments || [])]
+              comments: [newCommentData, ...(post.comments || [])],
+              comments_count: post.comments_count + 1
             }
           : post
       ));
@@ -146,6 +184,9 @@ const Blog: React.FC = () => {
         ...prev,
         [postId]: prev[postId].filter(comment => comment.id !== commentId)
       }));
+      setPosts(prev => prev.map(post =>
+        post.id === postId ? { ...post, comments_count: Math.max(post.comments_count - 1, 0) } : post
+      ));
     } catch (error) {
       console.error('Ошибка при удалении комментария:', error);
     }
@@ -262,18 +303,26 @@ const Blog: React.FC = () => {
             >
               {post.image && (
                 <div className="relative w-full h-48 sm:h-80 overflow-hidden">
-                  <img 
-                    src={post.image} 
-                    alt={post.title}
-                    className="absolute inset-0 w-full h-full object-contain bg-gray-900"
-                  />
+                  <picture>
+                    {post.image_variants && (
+                      <source type="image/webp" srcSet={post.image_variants.webp_srcset} sizes="(min-width: 640px) 640px, 100vw" />
+                    )}
+                    <img 
+                      src={post.image} 
+                      srcSet={post.image_variants?.srcset}
+                      sizes="(min-width: 640px) 640px, 100vw"
+                      alt={post.title}
+                      loading="lazy"
+                      className="absolute inset-0 w-full h-full object-contain bg-gray-900"
+                    />
+                  </picture>
                 </div>
               )}
               <div className="p-4 sm:p-6">
                 <div className="flex items-center gap-3 mb-4">
                   {post.user.avatar ? (
                     <img 
-                      src={`http://localhost:8000${post.user.avatar}`} 
+                      src={`http://localhost:8000${post.user.avatar_thumbnail || post.user.avatar}`} 
                       alt={post.user.username}
                       className="w-8 h-8 sm:w-10 sm:h-10 rounded-full object-cover"
                     />
@@ -309,7 +358,7 @@ const Blog: React.FC = () => {
                     className="flex items-center gap-2 text-gray-400 hover:text-yellow-500 transition"
                   >
                     <MessageCircle className="w-5 h-5" />
-                    <span className="text-sm sm:text-base">{post.comments?.length || 0}</span>
+                    <span className="text-sm sm:text-base">{post.comments_count}</span>
                     {expandedPost === post.id ? (
                       <ChevronUp className="w-4 h-4" />
                     ) : (
@@ -339,7 +388,7 @@ const Blog: React.FC = () => {
                             <div className="flex items-center gap-2 mb-1">
                               {comment.user.avatar ? (
                                 <img 
-                                  src={`http://localhost:8000${comment.user.avatar}`} 
+                                  src={`http://localhost:8000${comment.user.avatar_thumbnail || comment.user.avatar}`} 
                                   alt={comment.user.username}
                                   className="w-6 h-6 rounded-full object-cover"
                                 />
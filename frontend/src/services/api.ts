@@ -4,8 +4,8 @@ import { CoachGenerateType } from '../types/coach';
 import { RefreshTokenType, TokenType } from '../types/token.ts';
 import { WorkoutType } from '../types/workouts';
 import { NutritionType } from '../types/nutrition';
-import { ProgressChartType } from '../types/progress';
-import { CommentType, PostType, PaginatedResponse } from "../types/blog.ts";
+import { ProgressAnalyticsParams, ProgressAnalyticsType, ProgressChartType } from '../types/progress';
+import { CommentType, LikeStatusType, PostEventType, PostType, PostSearchType, PaginatedResponse } from "../types/blog.ts";
 
 
 const API_BASE_URL = 'http://localhost:8000/api';
@@ -67,6 +67,42 @@ api.interceptors.response.use(
   }
 );
 
+export const subscribePostEvents = (postIds: number[], onEvent: (event: PostEventType) => void) => {
+  const controller = new AbortController();
+
+  const listen = async () => {
+    // The server closes the stream periodically; reconnect until unsubscribed.
+    while (!controller.signal.aborted) {
+      const response = await fetch(`${API_BASE_URL}/blog/posts/events/?posts=${postIds.join(',')}`, {
+        headers: { Authorization: `Bearer ${getAccessToken()}` },
+        signal: controller.signal,
+      });
+      if (!response.ok || !response.body) return;
+
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+        const messages = buffer.split('\n\n');
+        buffer = messages.pop() || '';
+        for (const message of messages) {
+          const lines = message.split('\n');
+          const data = lines.find(line => line.startsWith('data: '));
+          if (data && !lines.includes('event: reconnect')) onEvent(JSON.parse(data.slice(6)));
+        }
+      }
+      await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+  };
+
+  listen().catch(error => {
+    if (error.name !== 'AbortError') console.error('Ошибка подписки на события блога:', error);
+  });
+  return () => controller.abort();
+};
+
 export const apiService = {
   // Auth
   login: (data: TokenType) => api.post('/token/', data),
@@ -93,6 +129,8 @@ export const apiService = {
 
   // Posts
   getPosts: () => api.get<PaginatedResponse<PostType>>('/blog/posts/'),
+  getTrendingPosts: () => api.get<PaginatedResponse<PostType>>('/blog/posts/trending/'),
+  searchPosts: (q: string) => api.get<PaginatedResponse<PostSearchType>>('/blog/posts/search/', { params: { q } }),
   createPost: (data: FormData) => api.post<PostType>('/blog/posts/', data),
   deletePost: (id: number) => api.delete(`/blog/posts/${id}/`),
 
@@ -103,9 +141,12 @@ export const apiService = {
 
   // Likes
   likePost: (id: number) => api.post(`/blog/posts/${id}/likes/`),
+  getLikeStatus: (ids: number[]) => api.post<{ results: LikeStatusType[] }>('/blog/posts/like-status/', { ids }),
 
   // Progress
   getProgress: () => api.get<ProgressChartType[]>('/progress/'),
+  getProgressAnalytics: (params: ProgressAnalyticsParams = {}) =>
+    api.get<ProgressAnalyticsType>('/progress/analytics/', { params }),
   createProgress: (data: FormData) => api.post<ProgressChartType>('/progress/', data),
   deleteProgress: (id: number) => api.delete(`/progress/${id}/`),
 };
@@ -1,21 +1,35 @@
+export interface ImageVariantsType {
+  thumbnail: string;
+  srcset: string;
+  webp_srcset: string;
+}
+
 export interface PostType {
   id: number;
   title: string;
   content: string;
   image: string | null;
+  image_variants?: ImageVariantsType | null;
   created_at: string;
   user: {
     id: number;
     username: string;
     avatar: string | null;
+    avatar_thumbnail?: string | null;
   };
   comments: CommentType[];
   likes_count: number;
+  comments_count: number;
   is_liked: boolean;
 }
 
+export interface PostSearchType extends PostType {
+  rank: number;
+  headline: string;
+}
+
 export interface PaginatedResponse<T> {
-  count: number;
+  count?: number;
   next: string | null;
   previous: string | null;
   results: T[];
@@ -29,6 +43,7 @@ export interface CommentType {
     id: number;
     username: string;
     avatar: string | null;
+    avatar_thumbnail?: string | null;
   };
 }
 
@@ -38,6 +53,24 @@ export interface LikeType {
     id: number;
     username: string;
     avatar: string | null;
+    avatar_thumbnail?: string | null;
   };
   created_at: string;
-}
\ No newline at end of file
+}
+
+export interface LikeStatusType {
+  id: number;
+  likes_count: number;
+  comments_count: number;
+  is_liked: boolean;
+}
+
+export interface PostEventType {
+  type: 'subscribed' | 'like' | 'unlike' | 'comment';
+  post_id: number;
+  user_id?: number;
+  likes_count?: number;
+  comments_count?: number;
+  comment?: CommentType;
+  truncated?: boolean;
+}
@@ -9,3 +9,37 @@ export interface ProgressChartType {
   bmi: number | null;
   created_at: string;
 }
+
+export interface ProgressBucketType {
+  date: string;
+  count: number;
+  weight: number | null;
+  weight_avg: number | null;
+  weight_trend: number | null;
+  bmi: number | null;
+  bmi_avg: number | null;
+  bmi_trend: number | null;
+}
+
+export interface ProgressAnalyticsType {
+  period: 'day' | 'week' | 'month';
+  window: number;
+  buckets: ProgressBucketType[];
+  trend: {
+    weight: { slope_per_week: number } | null;
+    bmi: { slope_per_week: number } | null;
+  };
+  projections: {
+    weight: string | null;
+    bmi: string | null;
+  };
+}
+
+export interface ProgressAnalyticsParams {
+  period?: 'day' | 'week' | 'month';
+  start?: string;
+  end?: string;
+  window?: number;
+  target_weight?: number;
+  target_bmi?: number;
+}